@@ -0,0 +1,125 @@
+import copy
+import hashlib
+import sys
+from array import array
+
+from Graph import Graph
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Pick the narrowest array type code able to hold every value exactly
+def value_typecode(values):
+    return "l" if all(type(value) is int for value in values) else "d"
+
+
+# Represents a read-only [CompiledGraph] snapshot of a graph of [Node]s
+class CompiledGraph(object):
+    """Compressed-sparse-row snapshot of a graph.
+
+    Nodes get dense integer ids in the graph's iteration order and
+    names[id] maps them back. The children of node i are
+    neighbors[offsets[i]:offsets[i + 1]], sorted by name like
+    SearchAgent.expand() visits them, with the edge costs at the same
+    positions of weights. heuristics[i] is the heuristic of node i.
+    in_offsets, in_neighbors and in_weights lay out the incoming edges
+    the same way. version and heuristics_version are those of the [Graph]
+    at compile time (None for a plain dict of nodes). Versions only tell apart the graphs
+    of one process, the fingerprint identifies the structure anywhere.
+    """
+
+    def __init__(self, graph):
+        self.version = graph.version if isinstance(graph, Graph) else None
+        self.heuristics_version = graph.heuristics_version if isinstance(graph, Graph) else None
+        self.names = list(graph.keys())
+        self.__fingerprint = None
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+        offsets = [0]
+        neighbors = []
+        weights = []
+        for name in self.names:
+            children = graph[name].children
+            for child_name in sorted(children.keys()):
+                neighbors.append(self.ids[child_name])
+                weights.append(children[child_name])
+            offsets.append(len(neighbors))
+        heuristics = [graph[name].heuristic for name in self.names]
+
+        # The same layout for the incoming edges, from the graph's index
+        parents = graph.parents if isinstance(graph, Graph) else Graph.index_parents(graph)
+        in_offsets = [0]
+        in_neighbors = []
+        in_weights = []
+        for name in self.names:
+            incoming = parents.get(name, {})
+            for parent_name in sorted(incoming.keys()):
+                in_neighbors.append(self.ids[parent_name])
+                in_weights.append(incoming[parent_name])
+            in_offsets.append(len(in_neighbors))
+
+        self.offsets = array("l", offsets)
+        self.neighbors = array("l", neighbors)
+        self.weights = array(value_typecode(weights), weights)
+        self.heuristics = array(value_typecode(heuristics), heuristics)
+        self.in_offsets = array("l", in_offsets)
+        self.in_neighbors = array("l", in_neighbors)
+        self.in_weights = array(value_typecode(in_weights), in_weights)
+
+    def __len__(self):
+        return len(self.names)
+
+    # A snapshot sharing this one's arrays but with the graph's current
+    # heuristics, for a graph whose edges did not change since
+    def with_heuristics(self, graph):
+        compiled = copy.copy(self)
+        heuristics = [graph[name].heuristic for name in self.names]
+        compiled.heuristics = array(value_typecode(heuristics), heuristics)
+        compiled.heuristics_version = graph.heuristics_version
+        return compiled
+
+    @property
+    def edge_count(self):
+        return len(self.neighbors)
+
+    # Digest of the node count and the edges with their costs, the same in
+    # every process and on every platform. Computed on first use
+    @property
+    def fingerprint(self):
+        if self.__fingerprint is None:
+            digest = hashlib.sha1()
+            for values in (self.offsets, self.neighbors, self.weights):
+                values = array("d", values)
+                if sys.byteorder == "big":
+                    values.byteswap()
+                digest.update(values.tobytes())
+            self.__fingerprint = f"{len(self)}:{digest.hexdigest()}"
+        return self.__fingerprint
+
+    # (child id, weight) pairs of the node with the given id
+    def edges(self, node_id):
+        start, end = self.offsets[node_id], self.offsets[node_id + 1]
+        return zip(self.neighbors[start:end], self.weights[start:end])
+
+    # Cost of the cheapest edge from one id to another
+    def edge_weight(self, from_id, to_id):
+        return min(weight for neighbor, weight in self.edges(from_id) if neighbor == to_id)
+
+    # (parent id, weight) pairs of the edges into the node with the given id
+    def incoming(self, node_id):
+        start, end = self.in_offsets[node_id], self.in_offsets[node_id + 1]
+        return zip(self.in_neighbors[start:end], self.in_weights[start:end])
+
+    # Zero-copy NumPy views of the arrays, None when NumPy is not available
+    def to_numpy(self):
+        if numpy is None:
+            return None
+        # The array type codes are C types NumPy understands as dtypes
+        return {name: numpy.frombuffer(values, dtype=values.typecode) for name, values in [
+            ("offsets", self.offsets), ("neighbors", self.neighbors),
+            ("weights", self.weights), ("heuristics", self.heuristics),
+            ("in_offsets", self.in_offsets), ("in_neighbors", self.in_neighbors),
+            ("in_weights", self.in_weights)]}
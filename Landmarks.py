@@ -0,0 +1,113 @@
+import heapq
+from array import array
+
+
+# Represents the ALT (A*, Landmarks, Triangle inequality) [Landmarks] of a
+# [CompiledGraph]
+class Landmarks(object):
+    """Shortest-path distances from and to a few landmark nodes.
+
+    For a landmark L, a node v and a goal t the triangle inequality gives
+    d(v, t) >= d(L, t) - d(L, v) and d(v, t) >= d(v, L) - d(t, L), so the
+    tables yield admissible (and consistent) heuristics for any goal, see
+    heuristics(). Landmarks are picked by farthest selection: each one is
+    the node farthest from the landmarks picked before it.
+
+    from_landmark and to_landmark hold one row of len(graph) distances per
+    landmark, back to back, in flat double arrays (infinity where there is
+    no path). They only depend on the edges: version is the version of the
+    [Graph] the snapshot was compiled from.
+    """
+
+    def __init__(self, compiled, count=4):
+        self.size = len(compiled)
+        self.version = compiled.version
+        self.landmarks = []
+        self.from_landmark = array("d")
+        self.to_landmark = array("d")
+
+        if self.size == 0:
+            return
+        # The first landmark is the node farthest from node 0, each next one
+        # the farthest from its closest landmark (unreachable nodes first)
+        farthest = distances(compiled.offsets, compiled.neighbors, compiled.weights, 0)
+        for _ in range(min(count, self.size)):
+            landmark = max(range(self.size), key=farthest.__getitem__)
+            if landmark in self.landmarks:
+                break
+            self.landmarks.append(landmark)
+            from_landmark = distances(compiled.offsets, compiled.neighbors, compiled.weights, landmark)
+            to_landmark = distances(compiled.in_offsets, compiled.in_neighbors, compiled.in_weights, landmark)
+            self.from_landmark.extend(from_landmark)
+            self.to_landmark.extend(to_landmark)
+            if len(self.landmarks) == 1:
+                farthest = from_landmark
+            else:
+                farthest = array("d", map(min, farthest, from_landmark))
+            farthest[landmark] = -1.0
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    # Lower bounds on the cost to the nearest of the goals (compiled ids)
+    def heuristics(self, goals):
+        return LandmarkHeuristics(self, goals)
+
+
+# Represents the [LandmarkHeuristics] of a set of goals
+class LandmarkHeuristics(object):
+    """Read like the compiled heuristics array (heuristics[node_id]), each
+    value is computed from the [Landmarks] tables on first use. Nodes that
+    provably reach no goal get infinity"""
+
+    def __init__(self, landmarks, goals):
+        size = landmarks.size
+        self.landmarks = landmarks
+        # (d(L, t), d(t, L)) for each landmark L, per goal t
+        self.goals = [[(landmarks.from_landmark[row + goal], landmarks.to_landmark[row + goal])
+                       for row in range(0, len(landmarks) * size, size)]
+                      for goal in goals]
+        self.values = {}
+
+    def __getitem__(self, node_id):
+        value = self.values.get(node_id)
+        if value is None:
+            value = self.values[node_id] = self.lower_bound(node_id)
+        return value
+
+    def lower_bound(self, node_id):
+        landmarks = self.landmarks
+        size = landmarks.size
+        inf = float("inf")
+        rows = [(landmarks.from_landmark[row + node_id], landmarks.to_landmark[row + node_id])
+                for row in range(0, len(landmarks) * size, size)]
+        best = inf
+        for goal_rows in self.goals:
+            bound = 0
+            for (from_node, to_node), (from_goal, to_goal) in zip(rows, goal_rows):
+                if from_node < inf:
+                    # A goal that L cannot reach can't be reached from the node
+                    bound = max(bound, from_goal - from_node)
+                if to_goal < inf:
+                    # Nor can it be when the node cannot reach L but the goal can
+                    bound = max(bound, to_node - to_goal)
+            best = min(best, bound)
+        return best
+
+
+# One-to-all Dijkstra over CSR arrays (forward or incoming edges)
+def distances(offsets, neighbors, weights, source):
+    result = array("d", [float("inf")]) * (len(offsets) - 1)
+    result[source] = 0.0
+    heap = [(0, source)]
+    while heap:
+        cost, node = heapq.heappop(heap)
+        if cost > result[node]:
+            continue
+        for k in range(offsets[node], offsets[node + 1]):
+            neighbor = neighbors[k]
+            new_cost = cost + weights[k]
+            if new_cost < result[neighbor]:
+                result[neighbor] = new_cost
+                heapq.heappush(heap, (new_cost, neighbor))
+    return result
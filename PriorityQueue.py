@@ -1,36 +1,196 @@
+import heapq
+
+
+# An entry of the [PriorityQueue], exposed through its iterable view
+class PriorityQueueItem(object):
+    __slots__ = ("data", "priority")
+
+    def __init__(self, data, priority):
+        self.data = data
+        self.priority = priority
+
+
 class PriorityQueue(object):
     def __init__(self, greatest=False):
-        self.queue = []
+        # Binary heap of (key, order, item) tuples; the insertion order breaks
+        # ties so equal priorities come out first-in first-out
+        self.heap = []
         self.greatest = greatest
+        self.counter = 0
 
     def __str__(self):
-        return ' '.join([str(i[0]) for i in self.queue])
+        return ' '.join([str(item.data) for item in self])
+
+    def __len__(self):
+        return len(self.heap)
+
+    # Iterable view of the queued items (heap order, not pop order)
+    def __iter__(self):
+        return (entry[2] for entry in self.heap)
 
     # for checking if the queue is empty
     def isEmpty(self):
-        return len(self.queue) == 0
+        return len(self.heap) == 0
 
     def isNotEmpty(self):
         return not self.isEmpty()
 
     # for inserting an element in the queue
     def add(self, data, priority):
-        self.queue.append((data, priority))
+        key = -priority if self.greatest else priority
+        heapq.heappush(self.heap, (key, self.counter, PriorityQueueItem(data, priority)))
+        self.counter += 1
+
+    # the priority of the element pop() returns next
+    def top_priority(self):
+        return self.heap[0][2].priority
 
     # for popping an element based on Priority
     def pop(self):
         try:
-            index = 0
-            for i in range(len(self.queue)):
-                if self.greatest:
-                    if self.queue[i][1] > self.queue[index][1]:
-                        index = i
-                else:
-                    if self.queue[i][1] < self.queue[index][1]:
-                        index = i
-            item = self.queue[index]
-            del self.queue[index]
-            return item[0]
+            return heapq.heappop(self.heap)[2].data
         except IndexError:
             print()
             exit()
+
+
+# A [PriorityQueue] holding at most one entry per key (the node name by
+# default) that supports membership tests and decreasing an entry's priority
+class IndexedPriorityQueue(PriorityQueue):
+    def __init__(self, greatest=False, key=lambda data: data.name):
+        super(IndexedPriorityQueue, self).__init__(greatest)
+        # Heap entries are [key, order, item, name] lists and self.index maps
+        # each name to the position of its entry in the heap
+        self.key = key
+        self.index = {}
+        # Max-heap of (-key, -order, name) for pop_worst(), built on its first
+        # call. Entries popped, removed or re-keyed since stay in it, stale,
+        # until pop_worst() meets them
+        self.worst = None
+
+    def __contains__(self, name):
+        return name in self.index
+
+    # for checking if an entry with the given name is queued
+    def contains(self, name):
+        return name in self.index
+
+    # the priority of the queued entry with the given name
+    def priority(self, name):
+        return self.heap[self.index[name]][2].priority
+
+    # the data of the queued entry with the given name
+    def get(self, name):
+        return self.heap[self.index[name]][2].data
+
+    # for inserting an element in the queue
+    def add(self, data, priority):
+        name = self.key(data)
+        if name in self.index:
+            raise KeyError(f"{name} is already queued")
+        key = -priority if self.greatest else priority
+        self.heap.append([key, self.counter, PriorityQueueItem(data, priority), name])
+        if self.worst is not None:
+            heapq.heappush(self.worst, (-key, -self.counter, name))
+        self.counter += 1
+        self.index[name] = len(self.heap) - 1
+        self.sift_up(len(self.heap) - 1)
+
+    # Replace the entry for data's name if the new priority is better, the entry
+    # is then ordered as if it had just been added. Returns whether it changed
+    def decrease_key(self, data, priority):
+        position = self.index[self.key(data)]
+        entry = self.heap[position]
+        key = -priority if self.greatest else priority
+        if key >= entry[0]:
+            return False
+        entry[0] = key
+        entry[1] = self.counter
+        entry[2] = PriorityQueueItem(data, priority)
+        if self.worst is not None:
+            heapq.heappush(self.worst, (-key, -self.counter, entry[3]))
+        self.counter += 1
+        self.sift_up(position)
+        return True
+
+    # for popping an element based on Priority
+    def pop(self):
+        if not self.heap:
+            raise IndexError("pop from an empty priority queue")
+        last = self.heap.pop()
+        if self.heap:
+            entry = self.heap[0]
+            self.heap[0] = last
+            self.index[last[3]] = 0
+            self.sift_down(0)
+        else:
+            entry = last
+        del self.index[entry[3]]
+        return entry[2].data
+
+    # Remove the entry that would be popped last (the worst priority, the
+    # latest added among equals) and return its data and priority, in
+    # O(log n) amortized. The worst-first heap is rebuilt from the live
+    # entries once the stale ones outnumber them
+    def pop_worst(self):
+        heap, index, worst = self.heap, self.index, self.worst
+        if not heap:
+            raise IndexError("pop from an empty priority queue")
+        if worst is None or len(worst) > 2 * len(heap) + 64:
+            worst = self.worst = [(-entry[0], -entry[1], entry[3]) for entry in heap]
+            heapq.heapify(worst)
+        while True:
+            _, order, name = heapq.heappop(worst)
+            position = index.get(name)
+            # Live when the entry was not popped or re-keyed since
+            if position is not None and heap[position][1] == -order:
+                break
+        item = heap[position][2]
+        self.remove(name)
+        return item.data, item.priority
+
+    # Remove the entry with the given name and return its data
+    def remove(self, name):
+        heap = self.heap
+        position = self.index.pop(name)
+        entry = heap[position]
+        last = heap.pop()
+        if position < len(heap):
+            heap[position] = last
+            self.index[last[3]] = position
+            self.sift_up(position)
+            self.sift_down(self.index[last[3]])
+        return entry[2].data
+
+    def sift_up(self, position):
+        heap = self.heap
+        entry = heap[position]
+        while position > 0:
+            parent_position = (position - 1) >> 1
+            parent = heap[parent_position]
+            if not entry < parent:
+                break
+            heap[position] = parent
+            self.index[parent[3]] = position
+            position = parent_position
+        heap[position] = entry
+        self.index[entry[3]] = position
+
+    def sift_down(self, position):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[position]
+        child_position = 2 * position + 1
+        while child_position < size:
+            right_position = child_position + 1
+            if right_position < size and heap[right_position] < heap[child_position]:
+                child_position = right_position
+            child = heap[child_position]
+            if not child < entry:
+                break
+            heap[position] = child
+            self.index[child[3]] = position
+            position = child_position
+            child_position = 2 * position + 1
+        heap[position] = entry
+        self.index[entry[3]] = position
@@ -0,0 +1,737 @@
+"""Benchmarks for the search engine.
+
+Run with CPython from the repository root (the visualizer itself runs the
+same modules under Brython):
+
+    python benchmark.py [section ...]
+
+Every section prints a small table; with no arguments all sections run.
+"""
+import contextlib
+import heapq
+import io
+import random
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from CompiledGraph import CompiledGraph
+from ContractionHierarchy import ContractionHierarchy
+from DistanceMatrix import DistanceMatrix
+from Graph import Graph
+from KShortestPaths import KShortestPaths
+from Node import Node, SearchNode
+from SearchAgent import SearchAgent
+
+
+########################################
+########        Helpers         ########
+########################################
+
+def random_graph(node_count, edge_count, seed=0, max_weight=9):
+    """Undirected random graph shaped like the editor's: node 0 is the source"""
+    rnd = random.Random(seed)
+    graph = {name: Node(name, (0, 0)) for name in range(node_count)}
+    graph[0].state = "source"
+    edges = 0
+    while edges < edge_count:
+        a, b = rnd.randrange(node_count), rnd.randrange(node_count)
+        if a == b or b in graph[a].children:
+            continue
+        weight = rnd.randint(1, max_weight)
+        graph[a].children[b] = weight
+        graph[b].children[a] = weight
+        edges += 1
+    return graph
+
+
+def grid_graph(side, seed=0):
+    """Road-like [Graph]: a side x side grid with weights from 10 to 19 per
+    unit step, so ten times the straight-line distance is a consistent
+    heuristic"""
+    rnd = random.Random(seed)
+    graph = {row * side + column: Node(row * side + column, (column, row))
+             for row in range(side) for column in range(side)}
+    graph[0].state = "source"
+    for name, node in graph.items():
+        column, row = node.position
+        for neighbor in ([name + 1] if column + 1 < side else []) + ([name + side] if row + 1 < side else []):
+            weight = rnd.randint(10, 19)
+            node.children[neighbor] = weight
+            graph[neighbor].children[name] = weight
+    return Graph(graph)
+
+
+def set_goal(graph, goal):
+    """Make goal the only goal of a [Graph], with straight-line heuristics
+    towards it"""
+    goal_x, goal_y = graph[goal].position
+    for name in list(graph.goals):
+        graph.set_state(name, "empty")
+    for name, node in graph.items():
+        x, y = node.position
+        node.heuristic = int(10 * ((x - goal_x) ** 2 + (y - goal_y) ** 2) ** 0.5)
+    graph.set_state(goal, "goal")
+
+
+def puzzle_graph():
+    """The 8-puzzle: one node per reachable board (181440), unit moves and
+    the Manhattan distance to the solved board as heuristic. Node 0 is the
+    solved board, the goal"""
+    solved = (1, 2, 3, 4, 5, 6, 7, 8, 0)
+    ids = {solved: 0}
+    boards = [solved]
+    for board in boards:
+        for neighbor in puzzle_moves(board):
+            if neighbor not in ids:
+                ids[neighbor] = len(boards)
+                boards.append(neighbor)
+    graph = {}
+    for board, name in ids.items():
+        heuristic = sum(abs(i // 3 - (tile - 1) // 3) + abs(i % 3 - (tile - 1) % 3)
+                        for i, tile in enumerate(board) if tile)
+        graph[name] = Node(name, (0, 0), heuristic=heuristic,
+                           children={ids[neighbor]: 1 for neighbor in puzzle_moves(board)})
+    graph[0].state = "goal"
+    return graph
+
+
+def puzzle_moves(board):
+    blank = board.index(0)
+    row, column = divmod(blank, 3)
+    for tile_row, tile_column in ((row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1)):
+        if 0 <= tile_row < 3 and 0 <= tile_column < 3:
+            moved = list(board)
+            moved[blank], moved[tile_row * 3 + tile_column] = moved[tile_row * 3 + tile_column], 0
+            yield tuple(moved)
+
+
+def measure_bytes(build, count):
+    """Traced allocation (in bytes) per object created by build(i)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The holding list is not part of the per-object cost
+    return (after - before - sys.getsizeof(objects)) / count
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def print_table(title, header, rows):
+    print(f"\n{title}")
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  ".join(str(cell).rjust(width) for cell, width in zip(row, widths)))
+
+
+########################################
+########        Sections        ########
+########################################
+
+# The pre-__slots__ node: mutable shared defaults and a per-instance __dict__
+class DictNode(object):
+    def __init__(self, name, position, state="empty", cost=0, heuristic=1, children={}, path=[]):
+        self.name = name
+        self.state = state
+        self.position = position
+        self.heuristic = heuristic
+        self.cost = cost
+        self.children = children
+        self.path = path
+
+
+def bench_node_memory(count=100000):
+    """Bytes per graph node and per generated frontier entry"""
+    depth = 20
+    ancestry = list(range(depth))
+    parent = SearchNode(0)
+    rows = [
+        ["graph node (__dict__)", measure_bytes(lambda i: DictNode(i, (0, 0), children={}), count)],
+        ["graph node (__slots__)", measure_bytes(lambda i: Node(i, (0, 0)), count)],
+        [f"frontier entry (Node copy, depth {depth})",
+         measure_bytes(lambda i: DictNode(i, (0, 0), "empty", i, 1, {}, ancestry + [i]), count)],
+        ["frontier entry (SearchNode)", measure_bytes(lambda i: SearchNode(i, parent, i, depth), count)],
+    ]
+    print_table(f"Node memory ({count} objects)", ["record", "bytes/object"],
+                [[name, f"{size:.1f}"] for name, size in rows])
+
+
+def dict_distances(graph, source):
+    """One-to-all Dijkstra expanding the editor's dict of [Node]s"""
+    distances = {source: 0}
+    heap = [(0, source)]
+    while heap:
+        cost, name = heapq.heappop(heap)
+        if cost > distances[name]:
+            continue
+        children = graph[name].children
+        for child_name in sorted(children.keys()):
+            new_cost = cost + children[child_name]
+            if new_cost < distances.get(child_name, new_cost + 1):
+                distances[child_name] = new_cost
+                heapq.heappush(heap, (new_cost, child_name))
+    return distances
+
+
+def compiled_distances(compiled, source):
+    """The same Dijkstra over the [CompiledGraph] arrays"""
+    offsets, neighbors, weights = compiled.offsets, compiled.neighbors, compiled.weights
+    distances = [None] * len(compiled)
+    distances[source] = 0
+    heap = [(0, source)]
+    while heap:
+        cost, node = heapq.heappop(heap)
+        if cost > distances[node]:
+            continue
+        for k in range(offsets[node], offsets[node + 1]):
+            child = neighbors[k]
+            new_cost = cost + weights[k]
+            if distances[child] is None or new_cost < distances[child]:
+                distances[child] = new_cost
+                heapq.heappush(heap, (new_cost, child))
+    return distances
+
+
+def bench_compiled(edge_counts=(10000, 100000, 1000000), queries=3):
+    """CompiledGraph build time and one-to-all query time against the dict graph"""
+    rows = []
+    for edge_count in edge_counts:
+        graph = random_graph(edge_count // 5, edge_count)
+        compiled, build_time = timed(CompiledGraph, graph)
+        sources = random.Random(1).sample(range(len(compiled)), queries)
+        dict_time = sum(timed(dict_distances, graph, compiled.names[s])[1] for s in sources) / queries
+        csr_time = sum(timed(compiled_distances, compiled, s)[1] for s in sources) / queries
+        rows.append([edge_count, len(compiled), f"{build_time * 1000:.0f}",
+                     f"{dict_time * 1000:.0f}", f"{csr_time * 1000:.0f}", f"{dict_time / csr_time:.2f}x"])
+    print_table("CompiledGraph (undirected edges, one-to-all Dijkstra per query)",
+                ["edges", "nodes", "build ms", "dict ms/query", "csr ms/query", "speedup"], rows)
+
+
+ALGORITHMS = [
+    ("breadth_first_search", {}),
+    ("depth_first_search", {}),
+    ("depth_limit_search", {"limit": 4}),
+    ("iterative_deepening_search", {"max_depth_limit": 4}),
+    ("uniform_cost_search", {}),
+    ("greedy_search", {}),
+    ("a_star_search", {}),
+    ("iterative_deepening_a_star_search", {"max_iterations": 4}),
+    ("focal_search", {"epsilon": 0.1}),
+    ("anytime_a_star_search", {}),
+    ("bidirectional_search", {}),
+    ("bidirectional_uniform_cost_search", {}),
+    ("bidirectional_a_star_search", {}),
+]
+
+
+def run_visualized(agent, algorithm, params):
+    """Step through the agent's generator the way the animation loop does"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in getattr(agent, algorithm)(**params):
+            pass
+    return agent.nodes_visited
+
+
+def bench_headless(node_count=2000, edge_count=10000):
+    """Visualized generators against solve() on the same pinned snapshot"""
+    graph = random_graph(node_count, edge_count)
+    graph[node_count - 1].state = "goal"
+    agent = SearchAgent(graph)
+    agent.compile(pin=True)
+    rows = []
+    for algorithm, params in ALGORITHMS:
+        visited, visual_time = timed(run_visualized, agent, algorithm, params)
+        result, solve_time = timed(agent.solve, algorithm, **params)
+        assert result.nodes_visited == visited
+        rows.append([algorithm, visited, f"{visual_time * 1000:.1f}", f"{solve_time * 1000:.1f}",
+                     f"{visual_time / solve_time:.1f}x"])
+    print_table(f"Headless solve() ({node_count} nodes, {edge_count} edges)",
+                ["algorithm", "visited", "generator ms", "solve ms", "speedup"], rows)
+
+
+def bench_bidirectional(side=100, queries=20):
+    """Unidirectional searches against their weighted bidirectional versions"""
+    graph = grid_graph(side)
+    agent = SearchAgent(graph)
+    rnd = random.Random(2)
+    pairs = [tuple(rnd.sample(range(side * side), 2)) for _ in range(queries)]
+    algorithms = ["uniform_cost_search", "bidirectional_uniform_cost_search",
+                  "a_star_search", "bidirectional_a_star_search"]
+    totals = {algorithm: [0, 0.0] for algorithm in algorithms}
+    for source, goal in pairs:
+        set_goal(graph, goal)
+        agent.compile(pin=True)
+        costs = set()
+        for algorithm in algorithms:
+            result, elapsed = timed(agent.solve, algorithm, source=source)
+            costs.add(result.cost)
+            totals[algorithm][0] += result.nodes_visited
+            totals[algorithm][1] += elapsed
+        assert len(costs) == 1
+    baseline = totals["uniform_cost_search"][0]
+    rows = [[algorithm, visited // queries, f"{visited / baseline:.2f}", f"{elapsed * 1000 / queries:.1f}"]
+            for algorithm, (visited, elapsed) in totals.items()]
+    print_table(f"Bidirectional search ({side}x{side} grid, {queries} random pairs, equal costs)",
+                ["algorithm", "visited/query", "vs UCS", "ms/query"], rows)
+
+
+def traced_peak(function, *args, **kwargs):
+    """Result and peak traced allocation (in bytes) of a call"""
+    tracemalloc.start()
+    result = function(*args, **kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, peak
+
+
+def bench_ida_star(sources=(5000, 40000, 120000, 181000)):
+    """A* against IDA* on the 8-puzzle: equal costs, far less memory"""
+    graph = puzzle_graph()
+    agent = SearchAgent(graph)
+    agent.compile(pin=True)
+    rows = []
+    for source in sources:
+        a_star, a_star_peak = traced_peak(agent.solve, "a_star_search", source=source)
+        (ida_star, elapsed) = timed(agent.solve, "iterative_deepening_a_star_search", source=source)
+        _, ida_star_peak = traced_peak(agent.solve, "iterative_deepening_a_star_search", source=source)
+        assert ida_star.cost == a_star.cost
+        stats = ida_star.stats
+        rows.append([source, a_star.cost, a_star.nodes_visited, f"{a_star_peak / 1024:.0f}",
+                     stats["iterations"], " ".join(str(t) for t in stats["thresholds"]), ida_star.nodes_visited,
+                     stats["peak_fringe"], f"{ida_star_peak / 1024:.0f}", f"{elapsed * 1000:.0f}"])
+    print_table(f"IDA* (8-puzzle, {len(graph)} boards, Manhattan heuristic)",
+                ["source", "cost", "A* visited", "A* peak KiB", "iterations", "thresholds",
+                 "IDA* visited", "peak fringe", "IDA* peak KiB", "IDA* ms"], rows)
+
+
+def bench_max_frontier(side=100, caps=(None, 200, 50, 20), queries=10):
+    """A* with a capped fringe: SMA* backups against beam search, on the
+    grid and on a random graph whose fringe outgrows the caps"""
+    graph = grid_graph(side)
+    agent = SearchAgent(graph)
+    rnd = random.Random(3)
+    pairs = [tuple(rnd.sample(range(side * side), 2)) for _ in range(queries)]
+    rows = []
+    for cap in caps:
+        for beam in ([False] if cap is None else [False, True]):
+            optimal = visited = peak = 0
+            elapsed = 0.0
+            for source, goal in pairs:
+                set_goal(graph, goal)
+                agent.compile(pin=True)
+                exact = agent.solve("a_star_search", source=source)
+                result, seconds = timed(agent.solve, "a_star_search", source=source, max_frontier=cap, beam=beam)
+                optimal += result.cost == exact.cost
+                visited += result.nodes_visited
+                peak = max(peak, result.stats.get("peak_fringe", 0))
+                elapsed += seconds
+            mode = "exact" if cap is None else "beam" if beam else "SMA*"
+            rows.append(["-" if cap is None else cap, mode, f"{optimal}/{queries}",
+                         visited // queries, peak or "-", f"{elapsed * 1000 / queries:.1f}"])
+    print_table(f"A* with max_frontier ({side}x{side} grid, {queries} random pairs)",
+                ["max_frontier", "mode", "optimal", "visited/query", "peak fringe", "ms/query"], rows)
+
+    # The grid's fringe stays small, on a large random graph the caps bind
+    graph = Graph(random_graph(20000, 100000))
+    graph.set_state(19999, "goal")
+    agent = SearchAgent(graph)
+    agent.compile(pin=True)
+    rows = []
+    for cap in (None, 6000, 2000):
+        for beam in ([False] if cap is None else [False, True]):
+            result, seconds = timed(agent.solve, "a_star_search", max_frontier=cap, beam=beam)
+            mode = "exact" if cap is None else "beam" if beam else "SMA*"
+            rows.append(["-" if cap is None else cap, mode, result.cost, result.nodes_visited,
+                         result.stats.get("dropped", "-"), f"{seconds * 1000:.0f}"])
+    print_table("A* with max_frontier (random graph, 20000 nodes, 100000 edges, node 0 to 19999)",
+                ["max_frontier", "mode", "cost", "visited", "dropped", "ms"], rows)
+
+
+def bench_focal(side=100, epsilons=(0, 0.05, 0.1, 0.2, 0.5, 1.0), queries=10):
+    """Focal search expansions against exact A* across epsilon values, on the
+    grid (corner to corner and random pairs) and on the 8-puzzle (random
+    boards)"""
+    rnd = random.Random(4)
+    puzzle = puzzle_graph()
+    workloads = [
+        (f"{side}x{side} grid", grid_graph(side),
+         [(0, side * side - 1)] + [tuple(rnd.sample(range(side * side), 2)) for _ in range(queries - 1)]),
+        ("8-puzzle", puzzle, [(source, None) for source in rnd.sample(range(len(puzzle)), queries)]),
+    ]
+    rows = []
+    for label, graph, pairs in workloads:
+        agent = SearchAgent(graph)
+        agent.compile(pin=True)
+        exact_visited = 0
+        # visited, cost ratio, bound, seconds, re-expansions
+        totals = {epsilon: [0, 0.0, 0.0, 0.0, 0] for epsilon in epsilons}
+        for source, goal in pairs:
+            if goal is not None:
+                set_goal(graph, goal)
+                agent.compile(pin=True)
+            exact = agent.solve("a_star_search", source=source)
+            exact_visited += exact.nodes_visited
+            for epsilon in epsilons:
+                result, seconds = timed(agent.solve, "focal_search", source=source, epsilon=epsilon)
+                totals[epsilon][0] += result.nodes_visited
+                totals[epsilon][1] = max(totals[epsilon][1], result.cost / exact.cost)
+                totals[epsilon][2] = max(totals[epsilon][2], result.stats["bound"])
+                totals[epsilon][3] += seconds
+                totals[epsilon][4] += result.stats["reexpanded"]
+        rows.append([label, "A*", exact_visited // queries, "-", "1.00", "1.000", "1.000", "-"])
+        for epsilon, (visited, ratio, bound, seconds, reexpanded) in totals.items():
+            rows.append([label, epsilon, visited // queries, reexpanded // queries, f"{visited / exact_visited:.2f}",
+                         f"{ratio:.3f}", f"{bound:.3f}", f"{seconds * 1000 / queries:.1f}"])
+    print_table(f"Focal search ({queries} queries per graph)",
+                ["graph", "epsilon", "visited/query", "reexpanded/query", "vs A*", "max cost/optimal", "max bound",
+                 "ms/query"], rows)
+
+
+def bench_landmarks(side=150, counts=(0, 4, 8, 16), queries=20):
+    """A* with the editor's default heuristics (1 everywhere) against ALT
+    heuristics, the landmark tables are built once and reused by every query"""
+    graph = grid_graph(side)
+    for node in graph.values():
+        node.heuristic = 1
+    agent = SearchAgent(graph)
+    rnd = random.Random(5)
+    pairs = [tuple(rnd.sample(range(side * side), 2)) for _ in range(queries)]
+    rows = []
+    exact = {}
+    for count in counts:
+        agent.landmark_count = count
+        compiled = agent.compile(pin=True)
+        _, build_time = timed(agent.landmark_tables, compiled) if count else (None, 0.0)
+        visited = 0
+        elapsed = 0.0
+        for source, goal in pairs:
+            result, seconds = timed(agent.solve, "a_star_search", source=source, goals=[goal])
+            assert exact.setdefault((source, goal), result.cost) == result.cost
+            visited += result.nodes_visited
+            elapsed += seconds
+        rows.append([count or "node h", f"{build_time * 1000:.0f}", visited // queries,
+                     f"{elapsed * 1000 / queries:.1f}"])
+    print_table(f"ALT landmarks ({side}x{side} grid, {queries} random pairs, equal costs)",
+                ["landmarks", "build ms", "visited/query", "ms/query"], rows)
+
+
+def bench_contraction(sides=(25, 50, 70), queries=50):
+    """Contraction hierarchy preprocessing on growing grids, then queries on
+    the largest one against Dijkstra and bidirectional Dijkstra on the same
+    pairs"""
+    rows = []
+    for side in sides:
+        graph = grid_graph(side)
+        agent = SearchAgent(graph)
+        agent.compile(pin=True)
+        hierarchy, build_time = timed(agent.contraction_hierarchy)
+        text, save_time = timed(hierarchy.to_json)
+        _, load_time = timed(ContractionHierarchy.from_json, text)
+        rows.append([f"{side}x{side}", side * side, agent.compiled.edge_count, hierarchy.shortcut_count,
+                     f"{build_time:.1f}", len(text) // 1024, f"{save_time * 1000:.0f}",
+                     f"{load_time * 1000:.0f}"])
+    print_table("Contraction hierarchy preprocessing",
+                ["grid", "nodes", "edges", "shortcuts", "build s", "json KB", "save ms", "load ms"], rows)
+
+    rnd = random.Random(7)
+    pairs = [tuple(rnd.sample(range(side * side), 2)) for _ in range(queries)]
+    algorithms = [("uniform_cost_search", {}), ("bidirectional_uniform_cost_search", {}),
+                  ("contraction_hierarchy_search", {"hierarchy": hierarchy})]
+    totals = {algorithm: [0, 0.0] for algorithm, _ in algorithms}
+    for source, goal in pairs:
+        costs = set()
+        for algorithm, params in algorithms:
+            result, elapsed = timed(agent.solve, algorithm, source=source, goals=[goal], **params)
+            costs.add(result.cost)
+            totals[algorithm][0] += result.nodes_visited
+            totals[algorithm][1] += elapsed
+        assert len(costs) == 1
+    baseline = totals["uniform_cost_search"][1]
+    rows = [[algorithm, visited // queries, f"{elapsed * 1000 / queries:.2f}", f"{baseline / elapsed:.1f}x"]
+            for algorithm, (visited, elapsed) in totals.items()]
+    print_table(f"Contraction hierarchy queries ({side}x{side} grid, {queries} random pairs, equal costs,"
+                " paths unpacked)",
+                ["algorithm", "visited/query", "ms/query", "speedup"], rows)
+    queries_to_pay_off = build_time / (baseline - totals["contraction_hierarchy_search"][1]) * queries
+    print(f"preprocessing pays off after {queries_to_pay_off:.0f} queries")
+
+
+def bench_shortest_path_tree(side=100, queries=50):
+    """Toggling goals from the same source like the editor does (no pinned
+    snapshot): uniform cost search per goal against one cached
+    shortest-path tree"""
+    graph = grid_graph(side)
+    agent = SearchAgent(graph)
+    rnd = random.Random(6)
+    goals = rnd.sample(range(1, side * side), queries)
+    tree, build_time = timed(agent.shortest_path_tree)
+    ucs_time = tree_time = 0.0
+    for goal in goals:
+        for name in list(graph.goals):
+            graph.set_state(name, "empty")
+        graph.set_state(goal, "goal")
+        graph.set_heuristic(goal, 0)
+        cached, elapsed = timed(agent.solve, "shortest_path_tree_search", tree=agent.shortest_path_tree())
+        tree_time += elapsed
+        result, elapsed = timed(agent.solve, "uniform_cost_search")
+        ucs_time += elapsed
+        assert result.cost == cached.cost
+    print_table(f"Shortest-path tree ({side}x{side} grid, {queries} goals toggled, equal costs)",
+                ["search", "build ms", "ms/query"],
+                [["uniform_cost_search", "", f"{ucs_time * 1000 / queries:.2f}"],
+                 ["cached tree", f"{build_time * 1000:.0f}", f"{tree_time * 1000 / queries:.2f}"]])
+
+
+def bench_distance_matrix(samples=200):
+    """All-pairs distances: Floyd-Warshall, repeated Dijkstra and the automatic
+    choice against one uniform cost search per pair, in pairs per second"""
+    graphs = [("grid 30x30", grid_graph(30)), ("sparse 1000/2000", random_graph(1000, 2000)),
+              ("dense 400/20000", random_graph(400, 20000))]
+    rows = []
+    for label, graph in graphs:
+        agent = SearchAgent(graph)
+        compiled = agent.compile(pin=True)
+        pairs = len(compiled) ** 2
+        rnd = random.Random(8)
+        sample = [(rnd.choice(compiled.names), rnd.choice(compiled.names)) for _ in range(samples)]
+        ucs_time = sum(timed(agent.solve, "uniform_cost_search", source=source, goals=[target])[1]
+                       for source, target in sample)
+        row = [label, f"{samples / ucs_time:,.0f}"]
+        for method in ("floyd_warshall", "dijkstra", "auto"):
+            matrix, elapsed = timed(DistanceMatrix, compiled, method)
+            row.append(f"{pairs / elapsed:,.0f}")
+        for source, target in sample:
+            result = agent.solve("uniform_cost_search", source=source, goals=[target])
+            assert matrix.distance(source, target) == (result.cost if result.success else float("inf"))
+        row.append(matrix.method)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "distances.npy")
+            matrix.save(path)
+            loaded, elapsed = timed(matrix.load, path)
+            row += [os.path.getsize(path) // 1024, f"{elapsed * 1000:.1f}"]
+            del loaded
+        rows.append(row)
+    print_table("All-pairs distances (pairs per second, float32 .npy, memory-mapped load)",
+                ["graph", "UCS per pair", "floyd_warshall", "dijkstra", "auto", "auto picks", "KB", "load ms"],
+                rows)
+
+
+def bench_nearest_goals(side=100, goal_count=20, ks=(1, 5, 10, 20), trials=5):
+    """The k nearest of many goals: one sweep against a uniform cost search
+    per goal, keeping the k cheapest"""
+    graph = grid_graph(side)
+    agent = SearchAgent(graph)
+    agent.compile(pin=True)
+    rnd = random.Random(9)
+    rows = []
+    for k in ks:
+        totals = [0, 0.0, 0, 0.0]
+        for _ in range(trials):
+            goals = rnd.sample(range(1, side * side), goal_count)
+            ranked, elapsed = timed(agent.rank_goals, k, goals=goals)
+            totals[0] += agent.solve("nearest_goals_search", goals=goals, k=k).nodes_visited
+            totals[1] += elapsed
+            start = time.perf_counter()
+            results = [agent.solve("uniform_cost_search", goals=[goal]) for goal in goals]
+            totals[3] += time.perf_counter() - start
+            totals[2] += sum(result.nodes_visited for result in results)
+            assert [cost for _, cost, _ in ranked] == sorted(result.cost for result in results)[:k]
+        rows.append([k, totals[0] // trials, f"{totals[1] * 1000 / trials:.1f}",
+                     totals[2] // trials, f"{totals[3] * 1000 / trials:.1f}"])
+    print_table(f"Nearest goals ({side}x{side} grid, {goal_count} random goals, {trials} trials, equal costs)",
+                ["k", "sweep visited", "sweep ms", "per-goal UCS visited", "per-goal UCS ms"], rows)
+
+
+def bench_multi_source(side=100, depot_counts=(2, 5, 10, 20), trials=5):
+    """The nearest of several depots to a goal: one multi-source search
+    against one search per depot"""
+    graph = grid_graph(side)
+    agent = SearchAgent(graph)
+    rnd = random.Random(10)
+    rows = []
+    for algorithm in ("breadth_first_search", "uniform_cost_search", "a_star_search"):
+        for count in depot_counts:
+            totals = [0, 0.0, 0, 0.0]
+            for _ in range(trials):
+                goal, *depots = rnd.sample(range(side * side), count + 1)
+                set_goal(graph, goal)
+                agent.compile(pin=True)
+                merged, elapsed = timed(agent.solve, algorithm, source=depots)
+                totals[0] += merged.nodes_visited
+                totals[1] += elapsed
+                start = time.perf_counter()
+                results = [agent.solve(algorithm, source=depot) for depot in depots]
+                totals[3] += time.perf_counter() - start
+                totals[2] += sum(result.nodes_visited for result in results)
+                if algorithm != "breadth_first_search":
+                    assert merged.cost == min(result.cost for result in results)
+            rows.append([algorithm, count, totals[0] // trials, f"{totals[1] * 1000 / trials:.1f}",
+                         totals[2] // trials, f"{totals[3] * 1000 / trials:.1f}"])
+    print_table(f"Multi-source search ({side}x{side} grid, random depots and goal, {trials} trials)",
+                ["algorithm", "depots", "one sweep visited", "ms", "per-depot visited", "ms"], rows)
+
+
+def bench_k_shortest_paths(side=100, k=20, plain_k=3, pairs=3):
+    """Yen's k shortest paths with spur searches guided by the goal's reverse
+    shortest-path tree, against plain uniform cost spur searches (too slow
+    to go past plain_k). Times are cumulative up to the k-th path"""
+    graph = grid_graph(side)
+    agent = SearchAgent(graph)
+    compiled = agent.compile(pin=True)
+    rnd = random.Random(11)
+    times = {"tree": [0.0] * k, "plain": [0.0] * plain_k}
+    expanded = {"tree": [0] * k, "plain": [0] * plain_k}
+    build_time = 0.0
+    for _ in range(pairs):
+        source, goal = rnd.sample(range(side * side), 2)
+        tree, elapsed = timed(agent.shortest_path_tree, goal, reverse=True)
+        build_time += elapsed
+        costs = {}
+        for mode, count in (("tree", k), ("plain", plain_k)):
+            paths = KShortestPaths(compiled, source, goal, tree if mode == "tree" else None)
+            start = time.perf_counter()
+            for i, (_, cost) in enumerate(paths):
+                times[mode][i] += time.perf_counter() - start
+                expanded[mode][i] += paths.expanded
+                assert costs.setdefault(i, cost) == cost
+                if i + 1 == count:
+                    break
+    rows = []
+    for i in sorted({0, 1, 2, 4, 9, 14, k - 1}):
+        plain = [f"{times['plain'][i] * 1000 / pairs:.0f}", expanded["plain"][i] // pairs] if i < plain_k else ["", ""]
+        rows.append([i + 1, f"{times['tree'][i] * 1000 / pairs:.0f}", expanded["tree"][i] // pairs] + plain)
+    print_table(f"k shortest paths ({side}x{side} grid, {pairs} random pairs, reverse tree built in "
+                f"{build_time * 1000 / pairs:.0f} ms)",
+                ["k", "tree-guided ms", "expanded", "plain ms", "expanded"], rows)
+
+
+def bench_batch(side=100, sources=20, queries=1000, processes=(None, 2, 4)):
+    """Batches of mixed queries against one solve() per query (each compiling
+    the graph, like the visualizer's searches)"""
+    graph = grid_graph(side)
+    agent = SearchAgent(graph)
+    rnd = random.Random(12)
+    algorithms = ["uniform_cost_search", "a_star_search", "bidirectional_uniform_cost_search"]
+    starts = rnd.sample(range(side * side), sources)
+    batch = [(rnd.choice(starts), rnd.randrange(side * side), rnd.choice(algorithms)) for _ in range(queries)]
+    sample = batch[:50]
+    elapsed = sum(timed(agent.solve, algorithm, source=source, goals=[goal])[1] for source, goal, algorithm in sample)
+    rows = [["solve() per query", "", f"{len(sample) / elapsed:.0f}"]]
+    for count in processes:
+        runner = agent.batch_runner(count)
+        records = list(runner.run(batch))
+        assert len(records) == queries
+        rows.append([f"batch, {count or 1} process(es)", runner.trees, f"{runner.queries_per_second:.0f}"])
+    print_table(f"Batch queries ({side}x{side} grid, {queries} queries from {sources} sources, "
+                f"{len(algorithms)} algorithms)", ["runner", "shared trees", "queries/s"], rows)
+
+
+def bench_lifelong(side=100, edits=20):
+    """Replanning with LPA* after single edge edits against a fresh A* run,
+    for edits on the current path and for edits anywhere on the grid"""
+    graph = grid_graph(side)
+    goal = side * side - 1
+    set_goal(graph, goal)
+    agent = SearchAgent(graph)
+    planner = agent.incremental_planner()
+    agent.compile(pin=True)
+    first, first_time = timed(agent.solve, "lifelong_a_star_search", planner=planner)
+    rows = [["first search", first.nodes_visited, f"{first_time * 1000:.1f}", "", ""]]
+    rnd = random.Random(4)
+    for where in ("on the path", "anywhere"):
+        totals = [0, 0.0, 0, 0.0]
+        for _ in range(edits):
+            path = agent.solve("lifelong_a_star_search", planner=planner).path
+            if where == "on the path":
+                index = rnd.randrange(len(path) - 1)
+                ends = path[index], path[index + 1]
+            else:
+                ends = rnd.choice([(name, child) for name in [rnd.randrange(side * side)]
+                                   for child in graph[name].children])
+            weight = graph[ends[0]].children[ends[1]] * rnd.choice([3, 0.5])
+            agent.graph.add_edge(ends[0], ends[1], max(weight, 10))
+            agent.graph.add_edge(ends[1], ends[0], max(weight, 10))
+            agent.compile(pin=True)
+            fresh, fresh_time = timed(agent.solve, "a_star_search")
+            repaired, repair_time = timed(agent.solve, "lifelong_a_star_search", planner=planner)
+            assert fresh.cost == repaired.cost
+            totals[0] += fresh.nodes_visited
+            totals[1] += fresh_time
+            totals[2] += repaired.nodes_visited
+            totals[3] += repair_time
+        rows.append([f"edit {where}", totals[2] // edits, f"{totals[3] * 1000 / edits:.1f}",
+                     totals[0] // edits, f"{totals[1] * 1000 / edits:.1f}"])
+    print_table(f"Lifelong A* replanning ({side}x{side} grid, corner to corner, {edits} edits each, equal costs)",
+                ["search", "LPA* expanded", "LPA* ms", "A* visited", "A* ms"], rows)
+
+
+def bench_anytime(side=150, weight=2.5, step=0.5):
+    """When each ARA* solution arrives, against one exact A* run"""
+    graph = grid_graph(side)
+    set_goal(graph, side * side - 1)
+    agent = SearchAgent(graph)
+    agent.compile(pin=True)
+    exact, exact_time = timed(agent.solve, "a_star_search")
+    rows = []
+    start = time.perf_counter()
+    for path, cost, bound in agent.solutions(weight=weight, step=step):
+        rows.append([f"{(time.perf_counter() - start) * 1000:.1f}", cost, f"{bound:.3f}", f"{cost / exact.cost:.3f}"])
+    rows.append([f"{exact_time * 1000:.1f}", exact.cost, "A*", "1.000"])
+    print_table(f"ARA* solutions ({side}x{side} grid, corner to corner, weight {weight} step {step})",
+                ["ms", "cost", "bound", "cost/optimal"], rows)
+
+
+def bench_goal_index(node_count=100000, goals=10, lookups=100):
+    """The editor's goal lookups through the graph's index against the scans
+    over the node states they replace"""
+    graph = Graph(random_graph(node_count, node_count * 2))
+    for name in random.Random(1).sample(range(1, node_count), goals):
+        graph.set_state(name, "goal")
+    lookup_sets = [
+        ("any goal", lambda: any(node.state == "goal" for node in graph.values()), lambda: bool(graph.goals)),
+        ("goal list", lambda: [name for name, node in graph.items() if node.state == "goal"],
+         lambda: list(graph.goals)),
+    ]
+    rows = []
+    for label, scan, indexed in lookup_sets:
+        _, scan_time = timed(lambda: [scan() for _ in range(lookups)])
+        _, index_time = timed(lambda: [indexed() for _ in range(lookups)])
+        rows.append([label, f"{scan_time * 1e6 / lookups:.1f}", f"{index_time * 1e6 / lookups:.2f}"])
+    print_table(f"Goal lookups ({node_count} nodes, {goals} goals)",
+                ["lookup", "scan us", "index us"], rows)
+
+
+SECTIONS = {
+    "node_memory": bench_node_memory,
+    "compiled": bench_compiled,
+    "headless": bench_headless,
+    "bidirectional": bench_bidirectional,
+    "ida_star": bench_ida_star,
+    "max_frontier": bench_max_frontier,
+    "focal": bench_focal,
+    "anytime": bench_anytime,
+    "landmarks": bench_landmarks,
+    "contraction": bench_contraction,
+    "shortest_path_tree": bench_shortest_path_tree,
+    "nearest_goals": bench_nearest_goals,
+    "multi_source": bench_multi_source,
+    "k_shortest_paths": bench_k_shortest_paths,
+    "batch": bench_batch,
+    "distance_matrix": bench_distance_matrix,
+    "lifelong": bench_lifelong,
+    "goal_index": bench_goal_index,
+}
+
+
+if __name__ == "__main__":
+    for section in sys.argv[1:] or SECTIONS:
+        SECTIONS[section]()
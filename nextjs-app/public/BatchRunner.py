@@ -0,0 +1,124 @@
+import time
+from collections import OrderedDict
+
+from CompiledGraph import CompiledGraph
+from SearchSession import SearchSession
+from ShortestPathTree import ShortestPathTree
+
+try:
+    import multiprocessing
+except ImportError:
+    multiprocessing = None
+
+
+# Represents a [BatchRunner] answering many queries over one graph
+class BatchRunner(object):
+    """Runs batches of (source, goal, algorithm) queries, node names and a
+    [SearchSession] algorithm name, without visualization.
+
+    The graph is compiled once when the runner is created, so edits made
+    afterwards are not seen. Queries are grouped by source: a source with
+    at least tree_threshold uniform cost queries gets one
+    [ShortestPathTree] that answers all of them, the other queries run in
+    sessions that recycle one [SearchState]. A tree answer has the same
+    path and cost as the search, but nodes_visited is 0 and its stats are
+    the tree's, with stats["answered_by"] = "tree" to tell them apart.
+
+    run() streams (source, goal, algorithm, [SearchResult]) records one
+    source after the other, in the order the units of work finish when
+    they are fanned out over a multiprocessing pool of processes (where
+    the platform has one). report() sums up the throughput of the last run.
+    """
+
+    def __init__(self, graph, processes=None, tree_threshold=2, chunk_size=64):
+        super(BatchRunner, self).__init__()
+        self.graph = graph
+        self.compiled = CompiledGraph(graph)
+        self.processes = processes if multiprocessing is not None else None
+        self.tree_threshold = tree_threshold
+        self.chunk_size = chunk_size  # Queries per unit of work, besides the tree ones
+        self.search_state = None  # Recycled by the sessions of this process
+        self.queries = 0
+        self.trees = 0  # Shared trees built by the last run
+        self.seconds = 0.0
+
+    # Generator answering the queries, see the class docstring
+    def run(self, queries):
+        self.queries = self.trees = 0
+        start = time.perf_counter()
+        work = self.split(queries)
+        if self.processes:
+            with multiprocessing.Pool(self.processes, start_worker, (self.graph, self.tree_threshold)) as pool:
+                for records, trees in pool.imap_unordered(run_worker_group, work):
+                    self.trees += trees
+                    for record in records:
+                        self.queries += 1
+                        yield record
+        else:
+            for source, group in work:
+                for record in self.run_group(source, group):
+                    self.queries += 1
+                    yield record
+        self.seconds = time.perf_counter() - start
+
+    # Units of work (source, [(goal, algorithm), ...]): the uniform cost
+    # queries a tree answers stay together, the rest is cut into chunks so
+    # a pool can spread a busy source over its processes
+    def split(self, queries):
+        groups = OrderedDict()
+        for source, goal, algorithm in queries:
+            groups.setdefault(source, []).append((goal, algorithm))
+        work = []
+        for source, group in groups.items():
+            shared = [query for query in group if query[1] == "uniform_cost_search"]
+            if len(shared) >= self.tree_threshold:
+                work.append((source, shared))
+                group = [query for query in group if query[1] != "uniform_cost_search"]
+            for start in range(0, len(group), self.chunk_size):
+                work.append((source, group[start:start + self.chunk_size]))
+        return work
+
+    # Generator answering the (goal, algorithm) queries of one source
+    def run_group(self, source, group):
+        compiled = self.compiled
+        tree = None
+        if sum(algorithm == "uniform_cost_search" for _, algorithm in group) >= self.tree_threshold:
+            tree = ShortestPathTree(compiled, compiled.ids[source])
+            self.trees += 1
+        for goal, algorithm in group:
+            session = SearchSession(self.graph, compiled, source, [goal], self.search_state, visualize=False)
+            if tree is not None and algorithm == "uniform_cost_search":
+                session.stats["answered_by"] = "tree"
+                steps = session.shortest_path_tree_search(tree)
+            else:
+                steps = getattr(session, algorithm)()
+            for _ in steps:
+                pass
+            self.search_state = session.search_state
+            yield source, goal, algorithm, session.result
+
+    @property
+    def queries_per_second(self):
+        return self.queries / self.seconds if self.seconds else 0.0
+
+    # Throughput of the last run
+    def report(self):
+        return (f"{self.queries} queries in {self.seconds:.2f} s: {self.queries_per_second:.0f} queries/s "
+                f"({self.trees} shared trees, {self.processes or 1} process(es))")
+
+
+# The runner of a pool worker process, created once per process
+worker_runner = None
+
+
+def start_worker(graph, tree_threshold):
+    global worker_runner
+    worker_runner = BatchRunner(graph, tree_threshold=tree_threshold)
+
+
+# Answer a (source, group) of queries in a worker, the records and the
+# number of trees built come back to run() as lists
+def run_worker_group(item):
+    worker_runner.trees = 0
+    records = list(worker_runner.run_group(*item))
+    return records, worker_runner.trees
@@ -0,0 +1,227 @@
+import heapq
+import json
+from array import array
+
+from CompiledGraph import value_typecode
+
+
+# Represents the [ContractionHierarchy] of a [CompiledGraph]
+class ContractionHierarchy(object):
+    """Preprocessed graph for fast repeated point-to-point queries.
+
+    Nodes are contracted one at a time, cheapest first by edge difference
+    (the shortcuts contracting a node would add minus the edges it removes,
+    counted twice) plus how many of its neighbors are already contracted
+    and its level, which spread the contraction over the graph. Priorities
+    are re-evaluated lazily when a node comes up. Contracting v adds a
+    shortcut u -> w of cost d(u, v) + d(v, w) unless a witness path no
+    longer than that avoids v, searched for up to witness_limit settled
+    nodes and hop_limit edges. rank[v] is the position of v in that order.
+
+    Every shortest path then has an equally short path that only climbs in
+    rank and then only descends, so a query searches the upward edges from
+    the source and, backwards, from the goals (see
+    SearchSession.contraction_hierarchy_search()).
+
+    up_neighbors[up_offsets[v]:up_offsets[v + 1]] are the targets of the
+    edges leaving v towards higher ranks and down_neighbors (with
+    down_offsets) the sources of the edges entering v from higher ranks,
+    with their costs at the same positions of up_weights and down_weights.
+    The middles arrays hold the node a shortcut bypasses, or -1 for an
+    original edge. version is the version of the [Graph] the snapshot was
+    compiled from and fingerprint that of the [CompiledGraph], which a
+    hierarchy restored in another process is checked against.
+    """
+
+    def __init__(self, compiled=None, witness_limit=64, hop_limit=5):
+        if compiled is None:
+            return  # Filled in by from_json()
+        self.size = len(compiled)
+        self.version = compiled.version
+        self.fingerprint = compiled.fingerprint
+
+        # Remaining graph while contracting: {neighbor: (cost, middle)}
+        outgoing = [{} for _ in range(self.size)]
+        incoming = [{} for _ in range(self.size)]
+        for node in range(self.size):
+            for neighbor, weight in compiled.edges(node):
+                if neighbor != node:
+                    outgoing[node][neighbor] = (weight, -1)
+                    incoming[neighbor][node] = (weight, -1)
+
+        contracted_neighbors = [0] * self.size
+        levels = [0] * self.size  # Hops of the longest upward path into a node
+        up_edges = [None] * self.size
+        down_edges = [None] * self.size
+        rank = [0] * self.size
+        self.shortcut_count = 0
+
+        # The node's priority and the shortcuts contracting it now would add
+        def evaluate(node):
+            shortcuts = witness_shortcuts(outgoing, incoming, node, witness_limit, hop_limit)
+            edge_difference = len(shortcuts) - len(outgoing[node]) - len(incoming[node])
+            return 2 * edge_difference + contracted_neighbors[node] + levels[node], shortcuts
+
+        # Heap of (priority, node), one entry per remaining node. Contracting
+        # a node changes its neighbors' priorities, they are re-evaluated
+        # lazily: a popped node is evaluated again and pushed back when its
+        # priority no longer beats the next one
+        queue = [(evaluate(node)[0], node) for node in range(self.size)]
+        heapq.heapify(queue)
+        order = 0
+        while queue:
+            _, node = heapq.heappop(queue)
+            value, shortcuts = evaluate(node)
+            if queue and value > queue[0][0]:
+                heapq.heappush(queue, (value, node))
+                continue
+
+            rank[node] = order
+            order += 1
+            # The remaining neighbors all end up with higher ranks
+            up_edges[node] = [(neighbor, cost, middle) for neighbor, (cost, middle) in outgoing[node].items()]
+            down_edges[node] = [(neighbor, cost, middle) for neighbor, (cost, middle) in incoming[node].items()]
+            for neighbor in outgoing[node]:
+                del incoming[neighbor][node]
+            for neighbor in incoming[node]:
+                del outgoing[neighbor][node]
+            for source, target, cost in shortcuts:
+                if cost < outgoing[source].get(target, (float("inf"),))[0]:
+                    if target not in outgoing[source]:
+                        self.shortcut_count += 1
+                    outgoing[source][target] = (cost, node)
+                    incoming[target][source] = (cost, node)
+            neighbors = set(outgoing[node]) | set(incoming[node])
+            outgoing[node] = incoming[node] = None
+            for neighbor in neighbors:
+                contracted_neighbors[neighbor] += 1
+                levels[neighbor] = max(levels[neighbor], levels[node] + 1)
+
+        self.rank = array("l", rank)
+        self.up_offsets, self.up_neighbors, self.up_weights, self.up_middles = pack(up_edges)
+        self.down_offsets, self.down_neighbors, self.down_weights, self.down_middles = pack(down_edges)
+
+    def __len__(self):
+        return self.size
+
+    # (neighbor id, cost, middle) of the upward edges leaving the node
+    def up(self, node_id):
+        start, end = self.up_offsets[node_id], self.up_offsets[node_id + 1]
+        return zip(self.up_neighbors[start:end], self.up_weights[start:end], self.up_middles[start:end])
+
+    # (neighbor id, cost, middle) of the upward edges entering the node
+    def down(self, node_id):
+        start, end = self.down_offsets[node_id], self.down_offsets[node_id + 1]
+        return zip(self.down_neighbors[start:end], self.down_weights[start:end], self.down_middles[start:end])
+
+    # The middle node of the hierarchy edge source -> target, -1 for an
+    # original edge. The edge is stored at its lower ranked end
+    def middle(self, source, target):
+        if self.rank[source] < self.rank[target]:
+            edges, other = self.up(source), target
+        else:
+            edges, other = self.down(target), source
+        for neighbor, _, middle in edges:
+            if neighbor == other:
+                return middle
+        raise KeyError(f"no edge {source} -> {target}")
+
+    # The nodes of the original path a hierarchy edge stands for, without
+    # its source. The node a shortcut bypasses is ranked below both its ends
+    def unpack(self, source, target):
+        path = []
+        stack = [(source, target)]
+        while stack:
+            source, target = stack.pop()
+            middle = self.middle(source, target)
+            if middle == -1:
+                path.append(target)
+            else:
+                stack.append((middle, target))
+                stack.append((source, middle))
+        return path
+
+    # Serialize the hierarchy to a JSON string
+    def to_json(self):
+        state = {"size": self.size, "version": self.version, "fingerprint": self.fingerprint,
+                 "shortcut_count": self.shortcut_count}
+        for name in ARRAYS:
+            state[name] = getattr(self, name).tolist()
+        return json.dumps(state)
+
+    # Restore a hierarchy serialized by to_json()
+    @staticmethod
+    def from_json(text):
+        state = json.loads(text)
+        hierarchy = ContractionHierarchy()
+        hierarchy.size = state["size"]
+        hierarchy.version = state["version"]
+        hierarchy.fingerprint = state.get("fingerprint")
+        hierarchy.shortcut_count = state["shortcut_count"]
+        for name in ARRAYS:
+            values = state[name]
+            typecode = value_typecode(values) if name.endswith("weights") else "l"
+            setattr(hierarchy, name, array(typecode, values))
+        return hierarchy
+
+
+# The arrays to_json() writes
+ARRAYS = ("rank", "up_offsets", "up_neighbors", "up_weights", "up_middles",
+          "down_offsets", "down_neighbors", "down_weights", "down_middles")
+
+
+# The shortcuts (source, target, cost) contracting the node needs: one for
+# each path in -> node -> out that no witness path avoiding the node
+# matches. Witness searches give up after settling witness_limit nodes and
+# only follow paths of up to hop_limit edges, which may only add unneeded
+# shortcuts
+def witness_shortcuts(outgoing, incoming, node, witness_limit, hop_limit):
+    heappush, heappop = heapq.heappush, heapq.heappop
+    inf = float("inf")
+    shortcuts = []
+    for source, (in_cost, _) in incoming[node].items():
+        targets = {target: in_cost + out_cost for target, (out_cost, _) in outgoing[node].items()
+                   if target != source}
+        if not targets:
+            continue
+        limit = max(targets.values())
+        remaining = len(targets)
+        costs = {source: 0}
+        heap = [(0, 0, source)]  # (cost, hops, node)
+        settled = 0
+        while heap and settled < witness_limit and remaining:
+            cost, hops, current = heappop(heap)
+            if cost > costs[current]:
+                continue
+            if cost > limit:
+                break
+            settled += 1
+            if current in targets:
+                remaining -= 1
+            if hops == hop_limit:
+                continue
+            for neighbor, (weight, _) in outgoing[current].items():
+                new_cost = cost + weight
+                if new_cost <= limit and neighbor != node and new_cost < costs.get(neighbor, inf):
+                    costs[neighbor] = new_cost
+                    heappush(heap, (new_cost, hops + 1, neighbor))
+        for target, cost in targets.items():
+            if costs.get(target, inf) > cost:
+                shortcuts.append((source, target, cost))
+    return shortcuts
+
+
+# Lay out per-node lists of (neighbor, cost, middle) as CSR arrays
+def pack(edges):
+    offsets = [0]
+    neighbors = []
+    weights = []
+    middles = []
+    for node_edges in edges:
+        for neighbor, cost, middle in sorted(node_edges):
+            neighbors.append(neighbor)
+            weights.append(cost)
+            middles.append(middle)
+        offsets.append(len(neighbors))
+    return (array("l", offsets), array("l", neighbors),
+            array(value_typecode(weights), weights), array("l", middles))
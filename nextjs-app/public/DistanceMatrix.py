@@ -0,0 +1,128 @@
+import json
+import re
+from array import array
+
+from Landmarks import distances
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# Represents the all-pairs [DistanceMatrix] of a [CompiledGraph]
+class DistanceMatrix(object):
+    """Shortest-path cost from every node to every node.
+
+    matrix[i][j] (matrix[i * size + j] without NumPy) is the cost from the
+    node with compiled id i to the one with id j, infinity where there is
+    no path, as float32 (exact for integer costs up to 2 ** 24). names maps
+    ids back to node names. Rows are computed by Floyd-Warshall over NumPy
+    arrays or by one heap-Dijkstra per source, see choose_method().
+
+    save() writes the matrix as a .npy file with the names next to it in a
+    .json file, load() reads them back, memory-mapped when NumPy is there.
+    """
+
+    def __init__(self, compiled=None, method="auto"):
+        if compiled is None:
+            return  # Filled in by load()
+        self.names = list(compiled.names)
+        self.ids = dict(compiled.ids)
+        self.size = len(compiled)
+        self.version = compiled.version
+        self.method = choose_method(compiled) if method == "auto" else method
+        if self.method == "floyd_warshall":
+            self.matrix = floyd_warshall(compiled)
+        elif self.method == "dijkstra":
+            self.matrix = repeated_dijkstra(compiled)
+        else:
+            raise ValueError(f"unknown method {method!r}")
+
+    def __len__(self):
+        return self.size
+
+    # Cost from one node to another, by name
+    def distance(self, source, target):
+        ids = self.ids
+        if numpy is not None and isinstance(self.matrix, numpy.ndarray):
+            return float(self.matrix[ids[source], ids[target]])
+        return self.matrix[ids[source] * self.size + ids[target]]
+
+    # Write the matrix to path (a .npy file) and the names to path + ".json"
+    def save(self, path):
+        with open(path, "wb") as file:
+            header = "{'descr': '<f4', 'fortran_order': False, 'shape': (%d, %d), }" % (self.size, self.size)
+            # The header is padded so the data starts 64-byte aligned
+            header += " " * (63 - (10 + len(header)) % 64) + "\n"
+            file.write(b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, "little") + header.encode("latin1"))
+            if numpy is not None and isinstance(self.matrix, numpy.ndarray):
+                file.write(numpy.ascontiguousarray(self.matrix, dtype="<f4").tobytes())
+            else:
+                file.write(self.matrix.tobytes())
+        with open(path + ".json", "w") as file:
+            json.dump({"names": self.names, "version": self.version}, file)
+
+    # Read a matrix written by save()
+    @staticmethod
+    def load(path, mmap=True):
+        matrix = DistanceMatrix()
+        with open(path + ".json") as file:
+            state = json.load(file)
+        matrix.names = state["names"]
+        matrix.ids = {name: i for i, name in enumerate(matrix.names)}
+        matrix.version = state["version"]
+        matrix.size = len(matrix.names)
+        matrix.method = None
+        if numpy is not None:
+            matrix.matrix = numpy.load(path, mmap_mode="r" if mmap else None)
+        else:
+            with open(path, "rb") as file:
+                data = file.read()
+            header_length = int.from_bytes(data[8:10], "little")
+            header = data[10:10 + header_length].decode("latin1")
+            matrix.matrix = array("f")
+            matrix.matrix.frombytes(data[10 + header_length:])
+            if re.search(r"'shape': \((\d+), \1\)", header) is None or len(matrix.matrix) != matrix.size ** 2:
+                raise ValueError(f"{path} does not match its names")
+        return matrix
+
+
+# Floyd-Warshall runs n rounds over the n x n matrix, Dijkstra from every
+# source touches every edge n times: with NumPy the vectorized rounds win
+# until the matrix gets large or the graph very sparse
+def choose_method(compiled):
+    size, edges = len(compiled), compiled.edge_count
+    if numpy is None or size > 4096:
+        return "dijkstra"
+    # Measured: a NumPy round costs about 300x less per cell than Dijkstra
+    # in pure Python per edge
+    return "floyd_warshall" if size ** 2 <= 300 * edges else "dijkstra"
+
+
+# Floyd-Warshall as n vectorized minimum-plus rounds over a float32 matrix
+def floyd_warshall(compiled):
+    size = len(compiled)
+    arrays = compiled.to_numpy()
+    matrix = numpy.full((size, size), numpy.inf, dtype=numpy.float32)
+    sources = numpy.repeat(numpy.arange(size), numpy.diff(arrays["offsets"]))
+    numpy.minimum.at(matrix, (sources, arrays["neighbors"]), arrays["weights"].astype(numpy.float32))
+    numpy.fill_diagonal(matrix, 0)
+    for k in range(size):
+        numpy.minimum(matrix, matrix[:, k, None] + matrix[None, k, :], out=matrix)
+    return matrix
+
+
+# One Dijkstra per source, the rows go into a float32 matrix
+def repeated_dijkstra(compiled):
+    size = len(compiled)
+    if numpy is not None:
+        matrix = numpy.empty((size, size), dtype=numpy.float32)
+        for source in range(size):
+            row = distances(compiled.offsets, compiled.neighbors, compiled.weights, source)
+            matrix[source] = numpy.frombuffer(row, dtype=numpy.float64)
+        return matrix
+    matrix = array("f")
+    for source in range(size):
+        matrix.fromlist(distances(compiled.offsets, compiled.neighbors, compiled.weights, source).tolist())
+    return matrix
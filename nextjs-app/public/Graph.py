@@ -0,0 +1,130 @@
+# Represents the editable [Graph]: a dict of [Node]s keyed by name
+class Graph(dict):
+    """A dict of [Node]s that also indexes the incoming edges:
+    parents[name] maps each node with an edge to name onto that edge's
+    weight. Edit nodes and edges through the methods below (not through
+    the nodes' children dicts) so the index stays in step.
+
+    version changes with every edit of the nodes or edges (not of node
+    states or heuristics) and is never shared by two graphs, so anything
+    derived from the structure can be cached under it. heuristics_version
+    changes the same way with every set_heuristic().
+
+    edits logs each edge whose weight changed (added and removed edges
+    included) as ("edge", from_name, to_name), and each heuristic set with
+    set_heuristic() as ("heuristic", name), for an incremental search that
+    repairs its results (see [IncrementalPlanner]). It is None, and nothing
+    is logged, until log_edits() starts it; building the graph is not
+    logged. The search trims what it replayed. clear() stops the log.
+
+    goals (a dict used as an ordered set) and source index the names of
+    the goal nodes and of the source node, so finding them does not scan
+    the graph. They follow the states the nodes are added with and the
+    ones set with set_state(). The states a search paints ("visited",
+    "path") are written to the nodes directly and leave the index alone.
+    """
+
+    last_version = 0
+
+    def __init__(self, nodes=None):
+        super(Graph, self).__init__()
+        self.parents = {}
+        self.edits = None
+        self.goals = {}
+        self.source = None
+        self.version = self.next_version()
+        self.heuristics_version = self.version
+        if nodes is not None:
+            for node in nodes.values():
+                self.add_node(node)
+
+    @staticmethod
+    def next_version():
+        Graph.last_version += 1
+        return Graph.last_version
+
+    # Insert a node, indexing the edges its children dict already holds
+    def add_node(self, node):
+        self.version = self.next_version()
+        self[node.name] = node
+        self.parents.setdefault(node.name, {})
+        self.index_state(node.name, node.state)
+        for child_name, weight in node.children.items():
+            self.parents.setdefault(child_name, {})[node.name] = weight
+            self.log_edit(("edge", node.name, child_name))
+
+    # Remove a node and every edge to or from it, O(degree)
+    def remove_node(self, name):
+        self.version = self.next_version()
+        node = self.pop(name)
+        self.index_state(name, "empty")
+        for child_name in node.children:
+            self.parents.get(child_name, {}).pop(name, None)
+            self.log_edit(("edge", name, child_name))
+        for parent_name in self.parents.pop(name, {}):
+            if parent_name in self:
+                self[parent_name].children.pop(name, None)
+            self.log_edit(("edge", parent_name, name))
+        return node
+
+    # Add (or re-weight) the directed edge from_name -> to_name
+    def add_edge(self, from_name, to_name, weight=1):
+        self.version = self.next_version()
+        self[from_name].children[to_name] = weight
+        self.parents.setdefault(to_name, {})[from_name] = weight
+        self.log_edit(("edge", from_name, to_name))
+
+    def remove_edge(self, from_name, to_name):
+        self.version = self.next_version()
+        self[from_name].children.pop(to_name, None)
+        self.parents.get(to_name, {}).pop(from_name, None)
+        self.log_edit(("edge", from_name, to_name))
+
+    # Set a node's heuristic (this does not change the version)
+    def set_heuristic(self, name, heuristic):
+        self.heuristics_version = self.next_version()
+        self[name].heuristic = heuristic
+        self.log_edit(("heuristic", name))
+
+    # Start logging edits (if not done yet) and return the log
+    def log_edits(self):
+        if self.edits is None:
+            self.edits = []
+        return self.edits
+
+    def log_edit(self, edit):
+        if self.edits is not None:
+            self.edits.append(edit)
+
+    # Set a node's state, keeping the goal and source index in step (this
+    # does not change the version either)
+    def set_state(self, name, state):
+        self[name].state = state
+        self.index_state(name, state)
+
+    def index_state(self, name, state):
+        if state == "goal":
+            self.goals[name] = None
+        else:
+            self.goals.pop(name, None)
+        if state == "source":
+            self.source = name
+        elif self.source == name:
+            self.source = None
+
+    def clear(self):
+        self.version = self.next_version()
+        super(Graph, self).clear()
+        self.parents.clear()
+        self.edits = None
+        self.goals = {}
+        self.source = None
+
+    # The incoming-edge index of a plain dict of [Node]s
+    @staticmethod
+    def index_parents(nodes):
+        parents = {name: {} for name in nodes}
+        for node in nodes.values():
+            for child_name, weight in node.children.items():
+                parents.setdefault(child_name, {})[node.name] = weight
+        return parents
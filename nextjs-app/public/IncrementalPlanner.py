@@ -0,0 +1,148 @@
+from PriorityQueue import IndexedPriorityQueue
+
+
+# Represents the [IncrementalPlanner] of a [Graph]
+class IncrementalPlanner(object):
+    """Lifelong Planning A* (LPA*) over the editable [Graph].
+
+    The planner keeps its g-values (cost of the best path found so far),
+    rhs-values (one-step lookahead: the cheapest parent g plus the edge
+    cost) and its queue of locally inconsistent nodes (g != rhs) between
+    searches. search() first replays the edits the graph logged since the
+    last search, which only makes the heads of the edited edges
+    inconsistent, then expands inconsistent nodes in A* order until the
+    goal is consistent and no queued key is lower. After a local edit only
+    the region whose costs actually changed is searched again.
+
+    Edits have to be made through the [Graph] methods, the planner starts
+    the graph's edit log and empties it once replayed (so a graph serves
+    one planner). It starts over when the source, the goals or a
+    heuristic change, or when the graph is cleared. Like A* with a closed list it needs consistent
+    heuristics.
+    """
+
+    def __init__(self, graph):
+        super(IncrementalPlanner, self).__init__()
+        self.graph = graph
+        self.source = None
+        self.goals = None
+        self.edits = None  # The graph's edit log
+        self.g = {}
+        self.rhs = {}
+        self.queue = IndexedPriorityQueue(key=lambda name: name)
+        self.expanded = 0  # Nodes expanded by the last search
+        self.cost = None  # Cost of the path found by the last search
+        self.path = []
+
+    # Start over without any search effort to reuse
+    def restart(self, source, goals):
+        self.source = source
+        self.goals = goals
+        self.edits = self.graph.log_edits()
+        del self.edits[:]
+        self.g = {}
+        self.rhs = {source: 0}
+        self.queue = IndexedPriorityQueue(key=lambda name: name)
+        self.queue.add(source, self.key(source))
+
+    # Generator planning a path from source to the nearest of the goals
+    # (names), reusing what the previous search found. With visualize it
+    # yields the delta events of each expansion (see [SearchTrace]), so the
+    # repaired region shows up as the visited nodes. The result is left in
+    # path and cost (None when no goal can be reached)
+    def search(self, source, goals, visualize=False):
+        graph = self.graph
+        goals = frozenset(goals)
+        if source != self.source or goals != self.goals or self.edits is not graph.edits:
+            self.restart(source, goals)
+        else:
+            for edit in graph.edits:
+                if edit[0] == "heuristic":
+                    self.restart(source, goals)
+                    break
+                self.update_node(edit[2])
+            del graph.edits[:]
+        if visualize:
+            # The trace of a new search starts empty, the queue does not
+            events = [("push", item.data, item.priority[0]) for item in self.queue]
+
+        g, rhs, queue = self.g, self.rhs, self.queue
+        inf = float("inf")
+        self.expanded = 0
+        while queue.isNotEmpty():
+            goal = min(goals, key=self.key) if goals else None
+            if goal is not None and queue.top_priority() >= self.key(goal) and g.get(goal, inf) == rhs.get(goal, inf):
+                break
+            name = queue.pop()
+            self.expanded += 1
+            if visualize:
+                events.append(("pop", name))
+                # Goals keep their own color
+                if name not in goals:
+                    events.append(("close", name))
+            if g.get(name, inf) > rhs.get(name, inf):
+                # Overconsistent: a cheaper path was found, settle it
+                g[name] = rhs[name]
+            else:
+                # Underconsistent: the path got more expensive, re-derive it
+                g[name] = inf
+                self.update_node(name, events if visualize else None)
+            for child_name in graph[name].children:
+                self.update_node(child_name, events if visualize else None)
+            if visualize:
+                yield events
+                events = []
+
+        self.path = []
+        self.cost = None
+        goal = min(goals, key=self.key) if goals else None
+        if goal is not None and g.get(goal, inf) < inf:
+            self.cost = g[goal]
+            self.path = self.trace_back(goal)
+        if visualize and events:
+            yield events
+
+    # Recompute a node's rhs from its parents and requeue it if inconsistent
+    def update_node(self, name, events=None):
+        g, rhs, queue = self.g, self.rhs, self.queue
+        inf = float("inf")
+        queued = name in queue
+        if queued:
+            queue.remove(name)
+        if name not in self.graph:
+            # A removed node, its children were logged with their edges
+            g.pop(name, None)
+            rhs.pop(name, None)
+            if queued and events is not None:
+                events.append(("pop", name))
+            return
+        if name != self.source:
+            rhs[name] = min([g.get(parent_name, inf) + weight
+                             for parent_name, weight in self.graph.parents.get(name, {}).items()] or [inf])
+        if g.get(name, inf) != rhs.get(name, inf):
+            key = self.key(name)
+            queue.add(name, key)
+            if events is not None:
+                events.append(("update" if queued else "push", name, key[0]))
+        elif queued and events is not None:
+            events.append(("pop", name))
+
+    # LPA* key: (f, g) of the best known cost, ties go to lower costs
+    def key(self, name):
+        inf = float("inf")
+        cost = min(self.g.get(name, inf), self.rhs.get(name, inf))
+        return (cost + self.graph[name].heuristic, cost)
+
+    # Path from the source to a node with a final g, following the parents
+    # whose g plus edge cost gives the node's g
+    def trace_back(self, name):
+        g, parents = self.g, self.graph.parents
+        inf = float("inf")
+        path = [name]
+        while name != self.source:
+            # Skipping nodes already on the path guards against zero-cost cycles
+            name = min([edge for edge in parents[name].items() if edge[0] not in path],
+                       key=lambda edge: g.get(edge[0], inf) + edge[1])[0]
+            path.append(name)
+        path.reverse()
+        return path
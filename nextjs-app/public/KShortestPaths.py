@@ -0,0 +1,104 @@
+import heapq
+
+
+# Represents the [KShortestPaths] between two nodes of a [CompiledGraph]
+class KShortestPaths(object):
+    """Yen's algorithm: loopless paths from source to goal, cheapest first.
+
+    Each new path deviates from the previous one at some spur node: the
+    root (the previous path up to the spur node) is kept, the edges the
+    paths found so far take out of the same root are banned along with the
+    root's other nodes, and a spur search finds the cheapest way on to the
+    goal. Every spur path becomes a candidate in a heap, the cheapest
+    candidate is the next path.
+
+    With a reverse [ShortestPathTree] rooted at the goal, the first path is
+    read off the tree and the spur searches are A* searches using the
+    tree's distances to the goal, which stay admissible and consistent
+    whatever is banned. Without it they are uniform cost searches.
+
+    Iterating yields (path, cost) with the path as compiled ids. spur_searches
+    and expanded count the work done so far.
+    """
+
+    def __init__(self, compiled, source, goal, tree=None):
+        self.compiled = compiled
+        self.source = source
+        self.goal = goal
+        self.tree = tree
+        self.spur_searches = 0
+        self.expanded = 0
+
+    def __iter__(self):
+        if self.tree is not None:
+            first = self.tree.path(self.source)
+            if not first:
+                return
+            first = (self.path_cost(first), first)
+        else:
+            first = self.spur_search(self.source, set(), set())
+            if first is None:
+                return
+        found = [first[1]]
+        yield first[1], first[0]
+
+        candidates = []  # Heap of (cost, order, path)
+        seen = {tuple(first[1])}
+        while True:
+            previous = found[-1]
+            for i in range(len(previous) - 1):
+                root = previous[:i + 1]
+                banned_edges = {(path[i], path[i + 1]) for path in found if path[:i + 1] == root}
+                spur = self.spur_search(previous[i], set(root[:-1]), banned_edges)
+                if spur is None:
+                    continue
+                path = root[:-1] + spur[1]
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (self.path_cost(path), len(seen), path))
+            if not candidates:
+                return
+            cost, _, path = heapq.heappop(candidates)
+            found.append(path)
+            yield path, cost
+
+    # Cheapest (cost, path) from node to the goal avoiding the banned nodes
+    # and (from, to) edges, None when there is none
+    def spur_search(self, node, banned_nodes, banned_edges):
+        self.spur_searches += 1
+        graph = self.compiled
+        offsets, neighbors, weights = graph.offsets, graph.neighbors, graph.weights
+        estimates = self.tree.distances if self.tree is not None else None
+        inf = float("inf")
+        g_scores = {node: 0}
+        parents = {node: None}
+        heap = [(estimates[node] if estimates is not None else 0, 0, node)]
+        while heap:
+            _, cost, current = heapq.heappop(heap)
+            if cost > g_scores[current]:
+                continue
+            if current == self.goal:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parents[current]
+                path.reverse()
+                return cost, path
+            self.expanded += 1
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor = neighbors[k]
+                if neighbor in banned_nodes or (current, neighbor) in banned_edges:
+                    continue
+                new_cost = cost + weights[k]
+                if new_cost < g_scores.get(neighbor, inf):
+                    estimate = estimates[neighbor] if estimates is not None else 0
+                    if estimate == inf:
+                        continue  # The goal cannot be reached from there at all
+                    g_scores[neighbor] = new_cost
+                    parents[neighbor] = current
+                    heapq.heappush(heap, (new_cost + estimate, new_cost, neighbor))
+        return None
+
+    # Sum of the edge costs along a path of ids
+    def path_cost(self, path):
+        return sum(self.compiled.edge_weight(node, child) for node, child in zip(path, path[1:]))
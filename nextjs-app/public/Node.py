@@ -2,15 +2,50 @@
 class Node(object):
     """docstring for Node"""
 
-    def __init__(self, name, position, state="empty", cost=0, heuristic=1, children={}, path=[]):
+    # Graphs keep every node resident, so skip the per-instance __dict__
+    __slots__ = ("name", "state", "position", "heuristic", "cost", "children", "path")
+
+    def __init__(self, name, position, state="empty", cost=0, heuristic=1, children=None, path=()):
         self.name = name
         self.state = state
         self.position = position
         self.heuristic = heuristic
         self.cost = cost
-        self.children = children
+        self.children = {} if children is None else children
         self.path = path
 
+    @staticmethod
     def copy_from(node, cost, path):
         return Node(node.name, node.position, node.state, cost,
                     node.heuristic, node.children, path)
+
+
+# Represents a node of the search tree: the id of a node in a [CompiledGraph]
+# reached from its parent [SearchNode], so the path is only rebuilt when needed
+class SearchNode(object):
+    __slots__ = ("id", "parent", "cost", "depth")
+
+    def __init__(self, id, parent=None, cost=0, depth=0):
+        self.id = id
+        self.parent = parent
+        self.cost = cost
+        self.depth = depth
+
+    # Ids from the root of the search tree down to this node (inclusive)
+    def path(self):
+        ids = []
+        entry = self
+        while entry is not None:
+            ids.append(entry.id)
+            entry = entry.parent
+        ids.reverse()
+        return ids
+
+    # Whether the branch from the root down to this node passes through node_id
+    def on_path(self, node_id):
+        entry = self
+        while entry is not None:
+            if entry.id == node_id:
+                return True
+            entry = entry.parent
+        return False
@@ -1,596 +1,388 @@
-from PriorityQueue import PriorityQueue
-from Node import Node
+from collections import OrderedDict
+from itertools import islice
+
+from BatchRunner import BatchRunner
+from CompiledGraph import CompiledGraph
+from ContractionHierarchy import ContractionHierarchy
+from DistanceMatrix import DistanceMatrix
+from Graph import Graph
+from IncrementalPlanner import IncrementalPlanner
+from KShortestPaths import KShortestPaths
+from Landmarks import Landmarks
+from ShortestPathTree import ShortestPathTree
+from SearchSession import SearchSession
+from SearchTrace import SearchTrace
 
 
 class SearchAgent(object):
     """docstring for SearchAgent"""
 
-    def __init__(self, graph={}):
+    def __init__(self, graph=None):
         super(SearchAgent, self).__init__()
-        self.__agent_status = "idle"
-        self.graph = graph
-        self.nodes_visited = 0  # Track number of nodes visited during search
-        
-        # Live visualization arrays
-        self.fringe_array = []  # Current fringe/frontier nodes
-        self.visited_array = []  # Nodes that have been visited
-        self.traversal_array = []  # Order in which nodes were visited
-        self.path_array = []  # Final solution path (populated at the end)
+        self.graph = Graph() if graph is None else graph
+
+        # The [SearchSession] of the search the visualizer is following and the
+        # [SearchTrace] of the events it yielded so far
+        self.session = None
+        self.trace = SearchTrace()
+
+        # Compiled snapshot of the graph the searches run against
+        self.compiled = None
+        self.pinned = False
+
+        # Names the searches start from instead of the source node. Breadth-
+        # first, uniform cost and A* search seed all of them at cost 0 and
+        # report the one the path comes from in stats["source"]
+        self.sources = None
+
+        # Informed searches use ALT heuristics from this many landmarks
+        # instead of the node heuristics when it is not 0
+        self.landmark_count = 0
+        self.landmarks = None  # [Landmarks] tables, kept while the edges stay the same
+        self.hierarchy = None  # [ContractionHierarchy], kept the same way
+        self.planner = None  # [IncrementalPlanner] kept between searches
+        # [ShortestPathTree]s by (graph version, source name, reverse), least
+        # recently used first, at most tree_cache_size of them
+        self.trees = OrderedDict()
+        self.tree_cache_size = 8
+        self.matrix = None  # All-pairs [DistanceMatrix], kept like the landmarks
+
+        self.painted = 0  # How much of traversal_array paint() already wrote back
+        self.painted_round = 0
+        self.painted_path = []  # Best path so far of an anytime search, as painted
 
     ################################################
     ########		Search Algorithms		########
     ################################################
 
-    def breadth_first_search(self):
-        source = self.source
-        if not self.reserve_agent():
-            return
+    # Each algorithm runs in a fresh [SearchSession] that becomes the agent's
+    # current session, see search()
 
-        self.reset_graph()
-        fringe = []
-        node = source
-        fringe.append(node)
-        
-        # Initialize arrays
-        self.fringe_array = [node.name]
-        self.visited_array = []
-        self.traversal_array = []
-        self.path_array = []
-
-        while fringe:
-            node = fringe.pop(0)
-            
-            # Update fringe array
-            self.fringe_array = [n.name for n in fringe]
-            
-            if self.is_goal_state(node):
-                # Build path array from the path
-                self.path_array = node.path + [node.name]
-                self.finished("success", node)
-                return
-
-            if self.node_state(node) != "visited":
-                self.set_node_state(node, "visited")
-                # Add to traversal order
-                self.traversal_array.append(node.name)
-                # Add to visited array
-                if node.name not in self.visited_array:
-                    self.visited_array.append(node.name)
-                
-                for n in self.expand(node):
-                    if self.node_state(n) != "visited":
-                        fringe.append(n)
-                
-                # Update fringe array after expansion
-                self.fringe_array = [n.name for n in fringe]
-                yield
-
-        self.finished("failed", source)
+    def breadth_first_search(self):
+        return self.search("breadth_first_search")
 
     def depth_first_search(self):
-        source = self.source
-        if not self.reserve_agent():
-            return
-
-        self.reset_graph()
-        fringe = []
-        node = source
-        fringe.append(node)
-        
-        # Initialize arrays
-        self.fringe_array = [node.name]
-        self.visited_array = []
-        self.traversal_array = []
-        self.path_array = []
-
-        while fringe:
-            node = fringe.pop()
-            
-            # Update fringe array
-            self.fringe_array = [n.name for n in fringe]
-            
-            if self.is_goal_state(node):
-                # Build path array from the path
-                self.path_array = node.path + [node.name]
-                self.finished("success", node)
-                return
-
-            if self.node_state(node) != "visited":
-                self.set_node_state(node, "visited")
-                # Add to traversal order
-                self.traversal_array.append(node.name)
-                # Add to visited array
-                if node.name not in self.visited_array:
-                    self.visited_array.append(node.name)
-                
-                # Reverse to ensure leftmost child is explored first (since we pop from end)
-                for n in reversed(self.expand(node)):
-                    if self.node_state(n) != "visited":
-                        fringe.append(n)
-                
-                # Update fringe array after expansion
-                self.fringe_array = [n.name for n in fringe]
-                yield
-
-        self.finished("failed", source)
+        return self.search("depth_first_search")
 
     def depth_limit_search(self, limit):
-        source = self.source
-        if not self.reserve_agent():
-            return
-
-        self.reset_graph()
-        fringe = []
-        node = source
-        fringe.append(node)
-        
-        # Initialize arrays
-        self.fringe_array = [node.name]
-        self.visited_array = []
-        self.traversal_array = []
-        self.path_array = []
-
-        while fringe:
-            node = fringe.pop()
-            
-            # Update fringe array
-            self.fringe_array = [n.name for n in fringe]
-            
-            if self.is_goal_state(node):
-                # Build path array from the path
-                self.path_array = node.path + [node.name]
-                self.finished("success", node)
-                return
-
-            if self.node_state(node) != "visited":
-                self.set_node_state(node, "visited")
-                # Add to traversal order
-                self.traversal_array.append(node.name)
-                # Add to visited array
-                if node.name not in self.visited_array:
-                    self.visited_array.append(node.name)
-            
-            if len(node.path) < limit:
-                # Reverse to ensure leftmost child is explored first
-                for n in reversed(self.expand(node)):
-                    if self.node_state(n) != "visited":
-                        fringe.append(n)
-                
-                # Update fringe array after expansion
-                self.fringe_array = [n.name for n in fringe]
-
-            yield
-
-        self.finished("failed", source)
+        return self.search("depth_limit_search", limit)
 
     def iterative_deepening_search(self, max_depth_limit):
-        source = self.source
-        if not self.reserve_agent():
-            return
-        
-        # Initialize arrays
-        self.fringe_array = []
-        self.visited_array = []
-        self.traversal_array = []
-        self.path_array = []
-        
-        # Try increasing depth limits from 1 to max_depth_limit (inclusive)
-        for limit in range(1, max_depth_limit + 1):
-            self.reset_graph()
-            fringe = []
-            node = source
-            fringe.append(node)
-            
-            # Update fringe for this depth iteration
-            self.fringe_array = [node.name]
-
-            while fringe:
-                node = fringe.pop()
-                
-                # Update fringe array
-                self.fringe_array = [n.name for n in fringe]
-                
-                if self.is_goal_state(node):
-                    # Build path array from the path
-                    self.path_array = node.path + [node.name]
-                    self.finished("success", node)
-                    return
-
-                if self.node_state(node) != "visited":
-                    self.set_node_state(node, "visited")
-                    # Add to traversal order
-                    self.traversal_array.append(node.name)
-                    # Add to visited array
-                    if node.name not in self.visited_array:
-                        self.visited_array.append(node.name)
-                
-                if len(node.path) < limit:
-                    # Reverse to ensure leftmost child is explored first
-                    for i in reversed(self.expand(node)):
-                        if self.node_state(i) != "visited":
-                            fringe.append(i)
-                    
-                    # Update fringe array after expansion
-                    self.fringe_array = [n.name for n in fringe]
-
-                yield
-        
-        # If we exhausted all depth limits without finding goal
-        self.finished("failed", source)
+        return self.search("iterative_deepening_search", max_depth_limit)
+
+    def iterative_deepening_a_star_search(self, max_iterations=None):
+        return self.search("iterative_deepening_a_star_search", max_iterations)
 
     def uniform_cost_search(self):
-        source = self.source
-        if not self.reserve_agent():
-            return
+        return self.search("uniform_cost_search")
 
-        self.reset_graph()
-        fringe = PriorityQueue()
-        node = source
-        fringe.add(node, node.cost)
-        
-        # Initialize arrays
-        self.fringe_array = [node.name]
-        self.visited_array = []
-        self.traversal_array = []
-        self.path_array = []
-
-        while fringe.isNotEmpty():
-            node = fringe.pop()
-            
-            # Update fringe array (extract names from priority queue items)
-            self.fringe_array = [item.data.name for item in fringe.heap]
-            
-            if self.is_goal_state(node):
-                # Build path array from the path
-                self.path_array = node.path + [node.name]
-                self.finished("success", node)
-                return
-            
-            if self.node_state(node) != "visited":
-                self.set_node_state(node, "visited")
-                # Add to traversal order
-                self.traversal_array.append(node.name)
-                # Add to visited array
-                if node.name not in self.visited_array:
-                    self.visited_array.append(node.name)
-                
-                for n in self.expand(node):
-                    if self.node_state(n) != "visited":
-                        fringe.add(n, n.cost)
-                
-                # Update fringe array after expansion
-                self.fringe_array = [item.data.name for item in fringe.heap]
-
-            yield
-
-        self.finished("failed", source)
-
-    def greedy_search(self):
-        source = self.source
-        if not self.reserve_agent():
-            return
+    # Keeps searching past the first goal, see rank_goals()
+    def nearest_goals_search(self, k=None, weighted=True):
+        return self.search("nearest_goals_search", k, weighted)
 
-        self.reset_graph()
-        fringe = PriorityQueue()
-        node = source
-        fringe.add(node, node.heuristic)
-        
-        # Initialize arrays
-        self.fringe_array = [node.name]
-        self.visited_array = []
-        self.traversal_array = []
-        self.path_array = []
-
-        while fringe.isNotEmpty():
-            node = fringe.pop()
-            
-            # Update fringe array
-            self.fringe_array = [item.data.name for item in fringe.heap]
-            
-            if self.is_goal_state(node):
-                # Build path array from the path
-                self.path_array = node.path + [node.name]
-                self.finished("success", node)
-                return
-            
-            if self.node_state(node) != "visited":
-                self.set_node_state(node, "visited")
-                # Add to traversal order
-                self.traversal_array.append(node.name)
-                # Add to visited array
-                if node.name not in self.visited_array:
-                    self.visited_array.append(node.name)
-                
-                for n in self.expand(node):
-                    if self.node_state(n) != "visited":
-                        fringe.add(n, n.heuristic)
-                
-                # Update fringe array after expansion
-                self.fringe_array = [item.data.name for item in fringe.heap]
-
-            yield
-
-        self.finished("failed", source)
-
-    def a_star_search(self):
-        source = self.source
-        if not self.reserve_agent():
-            return
+    # With max_frontier the fringe is cut back to that many entries after
+    # every expansion: the worst are dropped and regenerated later (SMA*),
+    # or forgotten when beam is set
 
-        self.reset_graph()
-        fringe = PriorityQueue()
-        node = source
-        fringe.add(node, node.cost + node.heuristic)
-        
-        # Initialize arrays
-        self.fringe_array = [node.name]
-        self.visited_array = []
-        self.traversal_array = []
-        self.path_array = []
-
-        while fringe.isNotEmpty():
-            node = fringe.pop()
-            
-            # Update fringe array
-            self.fringe_array = [item.data.name for item in fringe.heap]
-            
-            if self.is_goal_state(node):
-                # Build path array from the path
-                self.path_array = node.path + [node.name]
-                self.finished("success", node)
-                return
-            
-            if self.node_state(node) != "visited":
-                self.set_node_state(node, "visited")
-                # Add to traversal order
-                self.traversal_array.append(node.name)
-                # Add to visited array
-                if node.name not in self.visited_array:
-                    self.visited_array.append(node.name)
-                
-                for n in self.expand(node):
-                    if self.node_state(n) != "visited":
-                        fringe.add(n, n.cost + n.heuristic)
-                
-                # Update fringe array after expansion
-                self.fringe_array = [item.data.name for item in fringe.heap]
-
-            yield
-
-        self.finished("failed", source)
+    def greedy_search(self, max_frontier=None, beam=False):
+        return self.search("greedy_search", max_frontier, beam)
 
-    def bidirectional_search(self):
-        """
-        Bidirectional BFS: Search from both start and goal simultaneously.
-        Meet in the middle for faster search on large graphs.
-        """
-        source = self.source
-        if not self.reserve_agent():
-            return
+    def a_star_search(self, max_frontier=None, beam=False):
+        return self.search("a_star_search", max_frontier, beam)
 
-        # Find goal node
-        goal_node = None
-        for node in self.graph.values():
-            if node.state == "goal":
-                goal_node = node
-                break
-        
-        if goal_node is None:
-            self.finished("failed", source)
-            return
+    def focal_search(self, epsilon=0.1):
+        return self.search("focal_search", epsilon)
+
+    def anytime_a_star_search(self, weight=2.5, step=0.5):
+        return self.search("anytime_a_star_search", weight, step)
 
-        self.reset_graph()
-        
-        # Two frontiers: forward from start, backward from goal
-        forward_fringe = [source]
-        backward_fringe = [goal_node]
-        
-        # Track visited nodes and their predecessors for path reconstruction
-        forward_visited = {}  # {node_name: parent_name}
-        backward_visited = {}
-        
-        # Mark source and goal as visited
-        forward_visited[source.name] = None
-        backward_visited[goal_node.name] = None
-        
-        # Initialize arrays (show both fringes combined)
-        self.fringe_array = [source.name, goal_node.name]
-        self.visited_array = []
-        self.traversal_array = []
-        self.path_array = []
-        
-        # Alternate between forward and backward search
-        forward_turn = True
-        meeting_point = None
-        
-        while forward_fringe and backward_fringe:
-            if forward_turn:
-                # Forward search step
-                if not forward_fringe:
-                    break
-                node = forward_fringe.pop(0)
-                
-                # Update fringe array (combine both fringes)
-                self.fringe_array = [n.name for n in forward_fringe] + [n.name for n in backward_fringe]
-                
-                # Check if this node was visited by backward search (meeting point!)
-                if node.name in backward_visited:
-                    meeting_point = node.name
-                    break
-                
-                # Mark as visited from forward direction and show it
-                if node.name != source.name:
-                    self.set_node_state(self.graph[node.name], "visited")
-                    # Add to traversal order
-                    self.traversal_array.append(node.name)
-                    # Add to visited array
-                    if node.name not in self.visited_array:
-                        self.visited_array.append(node.name)
-                    yield  # Yield after marking to show the node
-                
-                # Expand forward
-                for child_name in node.children.keys():
-                    if child_name not in forward_visited:
-                        forward_visited[child_name] = node.name
-                        child_node = self.graph[child_name]
-                        forward_fringe.append(child_node)
-                
-                # Update fringe array after expansion
-                self.fringe_array = [n.name for n in forward_fringe] + [n.name for n in backward_fringe]
-                
-            else:
-                # Backward search step
-                if not backward_fringe:
-                    break
-                node = backward_fringe.pop(0)
-                
-                # Update fringe array
-                self.fringe_array = [n.name for n in forward_fringe] + [n.name for n in backward_fringe]
-                
-                # Check if this node was visited by forward search (meeting point!)
-                if node.name in forward_visited:
-                    meeting_point = node.name
-                    break
-                
-                # Mark as visited from backward direction and show it
-                if node.name != goal_node.name:
-                    self.set_node_state(self.graph[node.name], "visited")
-                    # Add to traversal order
-                    self.traversal_array.append(node.name)
-                    # Add to visited array
-                    if node.name not in self.visited_array:
-                        self.visited_array.append(node.name)
-                    yield  # Yield after marking to show the node
-                
-                # Expand backward (find parents - nodes that have this as child)
-                for potential_parent in self.graph.values():
-                    if node.name in potential_parent.children:
-                        if potential_parent.name not in backward_visited:
-                            backward_visited[potential_parent.name] = node.name
-                            backward_fringe.append(potential_parent)
-                
-                # Update fringe array after expansion
-                self.fringe_array = [n.name for n in forward_fringe] + [n.name for n in backward_fringe]
-            
-            forward_turn = not forward_turn
-        
-        # Reconstruct path if meeting point found
-        if meeting_point:
-            # Build forward path: start → meeting_point
-            forward_path = []
-            current = meeting_point
-            while current is not None:
-                forward_path.append(current)
-                current = forward_visited.get(current)
-            forward_path.reverse()
-            
-            # Build backward path: meeting_point → goal
-            backward_path = []
-            current = backward_visited.get(meeting_point)
-            while current is not None:
-                backward_path.append(current)
-                current = backward_visited.get(current)
-            
-            # Combine paths
-            full_path = forward_path + backward_path
-            
-            # Set path array
-            self.path_array = full_path
-            
-            # Create result node with full path
-            result_node = Node.copy_from(
-                goal_node,
-                cost=len(full_path) - 1,
-                path=full_path[:-1]  # Exclude goal from path
-            )
-            
-            self.finished("success", result_node)
+    def bidirectional_search(self):
+        return self.search("bidirectional_search")
+
+    def bidirectional_uniform_cost_search(self):
+        return self.search("bidirectional_uniform_cost_search")
+
+    def bidirectional_a_star_search(self):
+        return self.search("bidirectional_a_star_search")
+
+    # Queries the graph's [ContractionHierarchy], built on first use
+    def contraction_hierarchy_search(self):
+        return self.search("contraction_hierarchy_search", self.contraction_hierarchy())
+
+    # Answers from the source's cached shortest-path tree, built on first use
+    def shortest_path_tree_search(self):
+        return self.search("shortest_path_tree_search", self.shortest_path_tree())
+
+    # Repairs the previous lifelong search after edits instead of starting over
+    def lifelong_a_star_search(self):
+        return self.search("lifelong_a_star_search", self.incremental_planner())
+
+    # Run an algorithm to completion without visualization (no yields, arrays
+    # or prints) and return its [SearchResult]. Algorithms are named like the
+    # methods above, params are their arguments (e.g. limit=3). source can be
+    # a list of names, see sources. This does not touch the agent's current
+    # session
+    def solve(self, algorithm, source=None, goals=None, **params):
+        session = self.create_session(source, goals, visualize=False)
+        for _ in getattr(session, algorithm)(**params):
+            pass
+        return session.result
+
+    # The k nearest goals (all of them when k is None) in one sweep, as a
+    # list of (goal, cost, path) nearest first. Unweighted, the cost is the
+    # number of edges
+    def rank_goals(self, k=None, source=None, goals=None, weighted=True):
+        return self.solve("nearest_goals_search", source, goals, k=k, weighted=weighted).stats["ranked"]
+
+    # A [BatchRunner] over a snapshot of the graph, for many queries at once:
+    # for record in agent.batch_runner().run([(source, goal, algorithm), ...])
+    def batch_runner(self, processes=None):
+        return BatchRunner(self.graph, processes)
+
+    # Up to k loopless paths from source to goal, cheapest first, as a list
+    # of (path, cost). The goal defaults to the first goal node. Spur
+    # searches are guided by the goal's cached reverse shortest-path tree
+    def k_shortest_paths(self, k, source=None, goal=None):
+        if source is None:
+            source = self.source.name
+        if goal is None:
+            if not self.graph.goals:
+                raise ValueError("no goal given and no goal node marked")
+            goal = next(iter(self.graph.goals))
+        tree = self.shortest_path_tree(goal, reverse=True)
+        compiled, names = self.compiled, self.compiled.names
+        paths = KShortestPaths(compiled, compiled.ids[source], compiled.ids[goal], tree)
+        return [([names[node_id] for node_id in path], cost) for path, cost in islice(paths, k)]
+
+    # Generator running an anytime algorithm without visualization, it yields
+    # (path, cost, bound) for each improved path as soon as it is found
+    def solutions(self, algorithm="anytime_a_star_search", source=None, goals=None, **params):
+        session = self.create_session(source, goals, visualize=False)
+        for events in getattr(session, algorithm)(**params):
+            for event in events:
+                if event[0] == "solution":
+                    yield event[1], event[2], event[3]
+
+    # Generator running a [SearchSession] algorithm as the agent's search, it
+    # yields each step's delta events after applying them to the trace
+    def search(self, algorithm, *args):
+        if not self.reserve_agent():
             return
-        
-        self.finished("failed", source)
+        session = self.session
+        for events in getattr(session, algorithm)(*args):
+            self.trace.apply(events)
+            yield events
+        # The path is recorded after the last step
+        self.trace.apply(session.take_events())
 
     ################################################
     ########		Utility Functions		########
     ################################################
 
+    # The agent's [Graph], plain dicts of [Node]s are wrapped so the editor
+    # tools can keep its incoming-edge index up to date
+    @property
+    def graph(self):
+        return self.__graph
+
+    @graph.setter
+    def graph(self, graph):
+        self.__graph = graph if isinstance(graph, Graph) else Graph(graph)
+
     @property
     def dimensions(self):
         return self.__dimensions
 
     @property
     def agent_status(self):
-        return self.__agent_status
+        return self.session.status if self.session is not None else "idle"
 
     @property
     def is_agent_searching(self):
-        return self.__agent_status == "searching"
+        return self.session is not None and self.session.is_searching
+
+    # Results of the current session
+
+    @property
+    def nodes_visited(self):
+        return self.session.nodes_visited if self.session is not None else 0
+
+    @property
+    def result_node(self):
+        return self.session.result_node if self.session is not None else None
+
+    @property
+    def stats(self):
+        return self.session.stats if self.session is not None else {}
+
+    # Live visualization arrays, materialized from the trace
+
+    @property
+    def fringe_array(self):
+        return self.trace.fringe_array
+
+    @property
+    def visited_array(self):
+        return self.trace.visited_array
+
+    @property
+    def traversal_array(self):
+        return self.trace.traversal_array
+
+    @property
+    def path_array(self):
+        return self.trace.path_array
 
     # Reserve the agent and prevent starting new alogorithms while searching
     def reserve_agent(self):
-        if self.__agent_status == "searching":
+        if self.is_agent_searching:
             return False
-        self.__agent_status = "searching"
-        self.nodes_visited = 0  # Reset counter at start of search
+        # The finished session's per-run arrays are recycled
+        previous_state = self.session.search_state if self.session is not None else None
+        self.session = self.create_session(search_state=previous_state)
+        self.trace = SearchTrace()
+        self.painted = self.painted_round = 0
+        self.painted_path = []
         return True
 
-    # To reset the grid to its initial state
+    # A new [SearchSession] over this agent's graph. Sessions only read the
+    # graph and the shared snapshot (see snapshot(), the graph is not copied
+    # per session), so any number of them can run concurrently. Defaults to
+    # the source node and the nodes currently marked as goals
+    def create_session(self, source=None, goals=None, search_state=None, visualize=True):
+        compiled = self.snapshot()
+        if source is None:
+            source = self.sources if self.sources else self.source.name
+        if goals is None:
+            goals = list(self.graph.goals)
+        heuristics = None
+        if self.landmark_count:
+            heuristics = self.landmark_tables(compiled).heuristics([compiled.ids[name] for name in goals])
+        return SearchSession(self.graph, compiled, source, goals, search_state, visualize, heuristics)
+
+    # The [Landmarks] of a snapshot, reused by every query until the edges
+    # change (a new graph version) or landmark_count does
+    def landmark_tables(self, compiled):
+        landmarks = self.landmarks
+        if (landmarks is None or compiled.version is None or landmarks.version != compiled.version
+                or len(landmarks) != min(self.landmark_count, len(compiled))):
+            landmarks = self.landmarks = Landmarks(compiled, self.landmark_count)
+        return landmarks
+
+    # The [ContractionHierarchy] of the graph, rebuilt when the edges change.
+    # Pass it to solve("contraction_hierarchy_search", hierarchy=...)
+    def contraction_hierarchy(self):
+        compiled = self.snapshot()
+        hierarchy = self.hierarchy
+        if hierarchy is None or compiled.version is None or hierarchy.version != compiled.version:
+            hierarchy = self.hierarchy = ContractionHierarchy(compiled)
+        return hierarchy
+
+    # The [ShortestPathTree] of a source (the source node by default), built
+    # once per graph version. Pass it to solve("shortest_path_tree_search",
+    # tree=...) along with the same source. A reverse tree holds the costs
+    # to the given node instead
+    def shortest_path_tree(self, source=None, reverse=False):
+        compiled = self.snapshot()
+        if source is None:
+            source = self.source.name
+        key = (compiled.version, source, reverse)
+        tree = self.trees.get(key) if compiled.version is not None else None
+        if tree is not None:
+            self.trees.move_to_end(key)
+            return tree
+        # Trees of older versions are never used again
+        for old_key in [old_key for old_key in self.trees if old_key[0] != compiled.version]:
+            del self.trees[old_key]
+        tree = ShortestPathTree(compiled, compiled.ids[source], reverse)
+        if compiled.version is not None:
+            self.trees[key] = tree
+            while len(self.trees) > self.tree_cache_size:
+                self.trees.popitem(last=False)
+        return tree
+
+    # The all-pairs [DistanceMatrix] of the graph, rebuilt when the edges
+    # change or another method is asked for ("auto" picks one)
+    def distance_matrix(self, method="auto"):
+        compiled = self.snapshot()
+        matrix = self.matrix
+        if (matrix is None or compiled.version is None or matrix.version != compiled.version
+                or method not in ("auto", matrix.method)):
+            matrix = self.matrix = DistanceMatrix(compiled, method)
+        return matrix
+
+    # The [IncrementalPlanner] of the agent's graph.
+    # Pass it to solve("lifelong_a_star_search", planner=...)
+    def incremental_planner(self):
+        if self.planner is None or self.planner.graph is not self.graph:
+            self.planner = IncrementalPlanner(self.graph)
+        return self.planner
+
+    # Compile the graph into the [CompiledGraph] snapshot the searches run
+    # against. A pinned snapshot is reused even after edits, until the next
+    # compile()
+    def compile(self, pin=False):
+        self.compiled = CompiledGraph(self.graph)
+        self.pinned = pin
+        return self.compiled
+
+    # The snapshot searches share: the pinned one, else the last one while
+    # the graph's version is the same. Only the heuristics are refreshed
+    # after set_heuristic(), anything else is compiled again
+    def snapshot(self):
+        compiled, graph = self.compiled, self.graph
+        if self.pinned:
+            return compiled
+        if compiled is None or compiled.version != graph.version:
+            return self.compile()
+        if compiled.heuristics_version != graph.heuristics_version:
+            compiled = self.compiled = compiled.with_heuristics(graph)
+        return compiled
+
+    # To reset the grid to its initial state (clears a previous paint()), the
+    # source and goals come back from the graph's index
     def reset_graph(self):
-        for node_name, node in self.graph.items():
-            self.graph[node_name].state = self.graph[node_name].state if self.graph[node_name].state in [
-                "source", "goal"] else "empty"
-
-    # The state of a certain node
-    def node_state(self, node):
-        return self.graph[node.name].state
-
-    def set_node_state(self, node, state):
-        # Track visited nodes
-        if state == "visited" and self.graph[node.name].state != "visited":
-            self.nodes_visited += 1
-        # Debug: log state changes so frontend can show them in console
-        try:
-            print(f"set_node_state: node={node.name} -> {state}")
-        except Exception:
-            # Fall back if node has no name attribute
-            print(f"set_node_state: setting state to {state}")
-        self.graph[node.name].state = state
-
-    # Checks whether the state is the goal state (goal)
-    def is_goal_state(self, node):
-        return self.node_state(node) == "goal"
-
-    # Expand a node to its valid new states
-    def expand(self, node):
-        # Sort children alphabetically to ensure leftmost-first traversal
-        return [Node.copy_from(self.graph[name], cost=node.cost + node.children[name], path=node.path + [node.name]) for name in sorted(node.children.keys())]
-
-    # Return actual cost
-    def cost(self, node):
-        return node.cost
-
-    # Retuen Heuristic
-    def heuristic(self, node):
-        return node.heuristic
-
-    # Get the source node (start state)
+        graph = self.graph
+        for node_name, node in graph.items():
+            node.state = "goal" if node_name in graph.goals else "source" if node_name == graph.source else "empty"
+
+    # Write the progress of the current search back to the node states for
+    # the visualizer: nodes visited since the last call, then the solution path
+    def paint(self):
+        session, trace = self.session, self.trace
+        if session is None:
+            return
+        if self.painted_round != trace.round_start:
+            # A new iterative deepening round starts from a clean graph
+            for node_name in trace.traversal_array[self.painted_round:trace.round_start]:
+                node = self.graph[node_name]
+                node.state = node.state if node.state in ["source", "goal"] else "empty"
+            self.painted = self.painted_round = trace.round_start
+        for node_name in trace.traversal_array[self.painted:]:
+            self.graph[node_name].state = "visited"
+        self.painted = len(trace.traversal_array)
+
+        if session.is_searching and trace.path_array:
+            # An anytime search keeps refining, show the best path so far
+            if self.painted_path is not trace.path_array:
+                for node_name in self.painted_path[1:-1]:
+                    node = self.graph[node_name]
+                    node.state = "visited" if node.state == "path" else node.state
+                self.painted_path = trace.path_array
+            for node_name in trace.path_array[1:-1]:
+                self.graph[node_name].state = "path"
+
+        if session.status == "failed":
+            self.source.state = "source"
+        elif session.status == "success":
+            path = trace.path_array[:-1]
+            for node_name in path:
+                self.graph[node_name].state = "path"
+            if len(path) > 0:
+                self.graph[path[0]].state = "source"
+
+    # Get the source node (start state), node 0 when none is marked
     @property
     def source(self):
-        return self.graph[0]
-
-    # Finished with "success" or "failed"
-    def finished(self, result, goal):
-        self.__agent_status = result
-        if result == "failed":
-            self.graph[goal.name].state = "source"
-            return
-
-        # Mark solution path in the graph and log it
-        try:
-            print(f"finished: result={result}, goal={goal.name}, path={goal.path}")
-        except Exception:
-            print(f"finished: result={result}")
-
-        for node_name in goal.path[0:]:
-            self.graph[node_name].state = "path"
-        if len(goal.path) > 0:
-            self.graph[goal.path[0]].state = "source"
+        graph = self.graph
+        return graph[graph.source if graph.source is not None else 0]
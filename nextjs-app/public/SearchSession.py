@@ -0,0 +1,1272 @@
+import heapq
+from collections import deque
+
+from Node import Node, SearchNode
+from PriorityQueue import IndexedPriorityQueue
+from SearchState import SearchState
+
+
+class SearchSession(object):
+    """One run of a search algorithm over a shared [CompiledGraph].
+
+    A session owns everything that changes while searching (the fringe,
+    the [SearchState], the counters, the visualization events and the
+    result) and only reads the graph, so any number of sessions can run
+    over the same graph at once, in threads or as interleaved generators.
+    Each session runs a single algorithm.
+    """
+
+    def __init__(self, graph, compiled, source, goals, search_state=None, visualize=True, heuristics=None):
+        super(SearchSession, self).__init__()
+        self.status = "idle"
+        # Without visualization the algorithms never yield nor record events
+        self.visualize = visualize
+        self.graph = graph  # The graph of [Node]s the snapshot was compiled from
+        self.compiled = compiled
+        # A single source name, or several for breadth-first, uniform cost
+        # and A* search (the other algorithms start from the first one)
+        sources = source if isinstance(source, (list, tuple, set, frozenset)) else [source]
+        self.sources = list(dict.fromkeys(compiled.ids[name] for name in sources))
+        self.source = self.sources[0]
+        self.goals = {compiled.ids[name] for name in goals}
+        # Estimated cost to the goals by compiled id, the node heuristics
+        # unless something better is supplied (e.g. [Landmarks])
+        self.heuristics = compiled.heuristics if heuristics is None else heuristics
+        self.nodes_visited = 0  # Track number of nodes visited during search
+        self.stats = {}  # Algorithm specific figures, reported with the result
+        # SMA*: {node id: (lowest priority of its dropped children, node)}
+        # and a heap of those backed-up priorities
+        self.backed_up = {}
+        self.forgotten = []
+
+        # Reuse the arrays of a finished run when they fit this graph, they
+        # are otherwise allocated once an algorithm needs them
+        if search_state is not None and search_state.size == len(compiled):
+            search_state.reset()
+        else:
+            search_state = None
+        self.__search_state = search_state
+
+        # Delta events for the visualizer, handed out by take_events()
+        self.events = []
+        self.path_array = []  # Final solution path (populated at the end)
+        self.result_node = None  # Goal [Node] carrying the solution path and cost
+
+    ################################################
+    ########		Search Algorithms		########
+    ################################################
+
+    # With visualization every algorithm yields, after each step, the list of
+    # delta events recorded since the previous step (see [SearchTrace])
+
+    def breadth_first_search(self):
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        fringe = deque()
+        # Every source is a root of the same search
+        for source in self.sources:
+            node = SearchNode(source)
+            fringe.append(node)
+            if visualize:
+                self.events.append(("push", names[node.id], node.depth))
+
+        while fringe:
+            node = fringe.popleft()
+            if visualize:
+                self.events.append(("pop", names[node.id]))
+            
+            if self.is_goal_state(node.id):
+                self.finished("success", node)
+                return
+
+            if not self.is_visited(node.id):
+                self.mark_visited(node.id)
+                if visualize:
+                    self.events.append(("close", names[node.id]))
+                
+                for n in self.expand(node):
+                    if not self.is_visited(n.id):
+                        fringe.append(n)
+                        if visualize:
+                            self.events.append(("push", names[n.id], n.depth))
+                
+                if visualize:
+                    yield self.take_events()
+
+        self.finished("failed")
+
+    def depth_first_search(self):
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        fringe = []
+        node = SearchNode(self.source)
+        fringe.append(node)
+        if visualize:
+            self.events.append(("push", names[node.id], node.depth))
+
+        while fringe:
+            node = fringe.pop()
+            if visualize:
+                self.events.append(("pop", names[node.id]))
+            
+            if self.is_goal_state(node.id):
+                self.finished("success", node)
+                return
+
+            if not self.is_visited(node.id):
+                self.mark_visited(node.id)
+                if visualize:
+                    self.events.append(("close", names[node.id]))
+                
+                # Reverse to ensure leftmost child is explored first (since we pop from end)
+                for n in reversed(self.expand(node)):
+                    if not self.is_visited(n.id):
+                        fringe.append(n)
+                        if visualize:
+                            self.events.append(("push", names[n.id], n.depth))
+                
+                if visualize:
+                    yield self.take_events()
+
+        self.finished("failed")
+
+    def depth_limit_search(self, limit):
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        fringe = []
+        node = SearchNode(self.source)
+        fringe.append(node)
+        if visualize:
+            self.events.append(("push", names[node.id], node.depth))
+
+        while fringe:
+            node = fringe.pop()
+            if visualize:
+                self.events.append(("pop", names[node.id]))
+            
+            if self.is_goal_state(node.id):
+                self.finished("success", node)
+                return
+
+            if not self.is_visited(node.id):
+                self.mark_visited(node.id)
+                if visualize:
+                    self.events.append(("close", names[node.id]))
+            
+            if node.depth < limit:
+                # Reverse to ensure leftmost child is explored first
+                for n in reversed(self.expand(node)):
+                    if not self.is_visited(n.id):
+                        fringe.append(n)
+                        if visualize:
+                            self.events.append(("push", names[n.id], n.depth))
+
+            if visualize:
+                yield self.take_events()
+
+        self.finished("failed")
+
+    def iterative_deepening_search(self, max_depth_limit):
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        
+        # Try increasing depth limits from 1 to max_depth_limit (inclusive)
+        for limit in range(1, max_depth_limit + 1):
+            self.search_state.reset()
+            fringe = []
+            node = SearchNode(self.source)
+            fringe.append(node)
+            if visualize:
+                # The fringe and the painted nodes restart for this depth iteration
+                self.events.append(("round", limit))
+                self.events.append(("push", names[node.id], node.depth))
+
+            while fringe:
+                node = fringe.pop()
+                if visualize:
+                    self.events.append(("pop", names[node.id]))
+                
+                if self.is_goal_state(node.id):
+                    self.finished("success", node)
+                    return
+
+                if not self.is_visited(node.id):
+                    self.mark_visited(node.id)
+                    if visualize:
+                        self.events.append(("close", names[node.id]))
+                
+                if node.depth < limit:
+                    # Reverse to ensure leftmost child is explored first
+                    for i in reversed(self.expand(node)):
+                        if not self.is_visited(i.id):
+                            fringe.append(i)
+                            if visualize:
+                                self.events.append(("push", names[i.id], i.depth))
+
+                if visualize:
+                    yield self.take_events()
+        
+        # If we exhausted all depth limits without finding goal
+        self.finished("failed")
+
+    def iterative_deepening_a_star_search(self, max_iterations=None):
+        """
+        IDA*: iterative deepening with f = g + h thresholds instead of depth
+        limits. Each round is a depth-first search that prunes the nodes
+        whose f exceeds the threshold, the next round raises it to the lowest
+        f that was pruned. Only the depth-first stack is kept (no closed set,
+        cycles are cut along the current branch), so memory grows with the
+        depth of the search rather than the size of the graph. Every
+        expansion counts as a visit.
+        """
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        heuristics = self.heuristics
+        self.stats["iterations"] = 0
+        thresholds = self.stats["thresholds"] = []
+        self.stats["peak_fringe"] = 0  # Most SearchNodes held at once
+
+        threshold = heuristics[self.source]
+        # An infinite estimate means no goal can be reached
+        while threshold < float("inf") and (max_iterations is None or len(thresholds) < max_iterations):
+            thresholds.append(threshold)
+            self.stats["iterations"] = len(thresholds)
+            next_threshold = float("inf")
+            fringe = []
+            node = SearchNode(self.source)
+            fringe.append(node)
+            if visualize:
+                # The fringe and the painted nodes restart for this threshold
+                self.events.append(("round", threshold))
+                self.events.append(("push", names[node.id], threshold))
+
+            while fringe:
+                node = fringe.pop()
+                if visualize:
+                    self.events.append(("pop", names[node.id]))
+
+                if self.is_goal_state(node.id):
+                    self.finished("success", node)
+                    return
+
+                self.nodes_visited += 1
+                if visualize:
+                    self.events.append(("close", names[node.id]))
+
+                # Reverse to ensure leftmost child is explored first
+                for n in reversed(self.expand(node)):
+                    if node.on_path(n.id):
+                        continue
+                    f = n.cost + heuristics[n.id]
+                    if f > threshold:
+                        next_threshold = min(next_threshold, f)
+                        continue
+                    fringe.append(n)
+                    if visualize:
+                        self.events.append(("push", names[n.id], f))
+                self.stats["peak_fringe"] = max(self.stats["peak_fringe"], len(fringe))
+
+                if visualize:
+                    yield self.take_events()
+
+            # Nothing was pruned: every branch has been searched
+            if next_threshold == float("inf"):
+                break
+            threshold = next_threshold
+
+        self.finished("failed")
+
+    def uniform_cost_search(self):
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        state = self.search_state
+        fringe = IndexedPriorityQueue(key=lambda n: n.id)
+        # Every source starts at cost 0 in the same fringe
+        for source in self.sources:
+            node = SearchNode(source)
+            state.set_g_score(node.id, node.cost)
+            fringe.add(node, node.cost)
+            if visualize:
+                self.events.append(("push", names[node.id], node.cost))
+
+        while fringe.isNotEmpty():
+            node = fringe.pop()
+            if visualize:
+                self.events.append(("pop", names[node.id]))
+            
+            if self.is_goal_state(node.id):
+                self.finished("success", node)
+                return
+            
+            if not self.is_visited(node.id):
+                self.mark_visited(node.id)
+                if visualize:
+                    self.events.append(("close", names[node.id]))
+                
+                for n in self.expand(node):
+                    # Keep a single entry per node, lowered when a cheaper route is found
+                    if not self.is_visited(n.id) and n.cost < state.g_score(n.id):
+                        state.set_g_score(n.id, n.cost)
+                        if fringe.contains(n.id):
+                            fringe.decrease_key(n, n.cost)
+                            if visualize:
+                                self.events.append(("update", names[n.id], n.cost))
+                        else:
+                            fringe.add(n, n.cost)
+                            if visualize:
+                                self.events.append(("push", names[n.id], n.cost))
+
+            if visualize:
+                yield self.take_events()
+
+        self.finished("failed")
+
+    def nearest_goals_search(self, k=None, weighted=True):
+        """
+        One sweep for several goals: uniform cost search (breadth-first
+        search by edges when not weighted) that keeps expanding past the
+        goals it reaches until it has the k nearest, or every goal when k
+        is None. stats["ranked"] lists (goal, cost, path) nearest first,
+        the cost being the ranking key (the number of edges when not
+        weighted), and the result is the nearest goal's path.
+        """
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        state = self.search_state
+        wanted = len(self.goals) if k is None else min(k, len(self.goals))
+        found = []
+        if weighted:
+            fringe = IndexedPriorityQueue(key=lambda n: n.id)
+        else:
+            fringe = deque()
+        node = SearchNode(self.source)
+        state.set_g_score(node.id, node.cost)
+        if weighted:
+            fringe.add(node, node.cost)
+        else:
+            fringe.append(node)
+        if visualize:
+            self.events.append(("push", names[node.id], node.cost if weighted else node.depth))
+
+        while len(found) < wanted and fringe:
+            node = fringe.pop() if weighted else fringe.popleft()
+            if visualize:
+                self.events.append(("pop", names[node.id]))
+            if self.is_visited(node.id):
+                continue
+            self.mark_visited(node.id)
+            if self.is_goal_state(node.id):
+                found.append(node)
+            elif visualize:
+                self.events.append(("close", names[node.id]))
+
+            for n in self.expand(node):
+                if self.is_visited(n.id):
+                    continue
+                if not weighted:
+                    fringe.append(n)
+                    if visualize:
+                        self.events.append(("push", names[n.id], n.depth))
+                elif n.cost < state.g_score(n.id):
+                    state.set_g_score(n.id, n.cost)
+                    if fringe.contains(n.id):
+                        fringe.decrease_key(n, n.cost)
+                        if visualize:
+                            self.events.append(("update", names[n.id], n.cost))
+                    else:
+                        fringe.add(n, n.cost)
+                        if visualize:
+                            self.events.append(("push", names[n.id], n.cost))
+
+            if visualize:
+                yield self.take_events()
+
+        self.stats["ranked"] = [(names[goal.id], goal.cost if weighted else goal.depth,
+                                 [names[node_id] for node_id in goal.path()]) for goal in found]
+        if found:
+            self.finished("success", found[0])
+        else:
+            self.finished("failed")
+
+    def greedy_search(self, max_frontier=None, beam=False):
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        heuristics = self.heuristics
+        fringe = IndexedPriorityQueue(key=lambda n: n.id)
+        node = SearchNode(self.source)
+        fringe.add(node, heuristics[node.id])
+        if visualize:
+            self.events.append(("push", names[node.id], heuristics[node.id]))
+
+        while fringe.isNotEmpty():
+            node = fringe.pop()
+            if visualize:
+                self.events.append(("pop", names[node.id]))
+            
+            if self.is_goal_state(node.id):
+                self.finished("success", node)
+                return
+            
+            if not self.is_visited(node.id):
+                self.mark_visited(node.id)
+                if visualize:
+                    self.events.append(("close", names[node.id]))
+                
+                for n in self.expand(node):
+                    if not self.is_visited(n.id):
+                        # The heuristic does not depend on the route, keep the first entry
+                        if not fringe.contains(n.id):
+                            fringe.add(n, heuristics[n.id])
+                            if visualize:
+                                self.events.append(("push", names[n.id], heuristics[n.id]))
+
+                if max_frontier is not None:
+                    self.trim_fringe(fringe, max_frontier, beam)
+
+            if visualize:
+                yield self.take_events()
+
+        self.finished("failed")
+
+    def a_star_search(self, max_frontier=None, beam=False):
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        heuristics = self.heuristics
+        state = self.search_state
+        fringe = IndexedPriorityQueue(key=lambda n: n.id)
+        # Every source starts at cost 0 in the same fringe
+        for source in self.sources:
+            node = SearchNode(source)
+            state.set_g_score(node.id, node.cost)
+            fringe.add(node, node.cost + heuristics[node.id])
+            if visualize:
+                self.events.append(("push", names[node.id], node.cost + heuristics[node.id]))
+
+        while fringe.isNotEmpty():
+            node = fringe.pop()
+            if visualize:
+                self.events.append(("pop", names[node.id]))
+            
+            if self.is_goal_state(node.id):
+                self.finished("success", node)
+                return
+            
+            if not self.is_visited(node.id):
+                self.mark_visited(node.id)
+                if visualize:
+                    self.events.append(("close", names[node.id]))
+                
+                for n in self.expand(node):
+                    # Keep a single entry per node, lowered when a cheaper route is found
+                    if not self.is_visited(n.id) and n.cost < state.g_score(n.id):
+                        state.set_g_score(n.id, n.cost)
+                        f = n.cost + heuristics[n.id]
+                        if fringe.contains(n.id):
+                            fringe.decrease_key(n, f)
+                            if visualize:
+                                self.events.append(("update", names[n.id], f))
+                        else:
+                            fringe.add(n, f)
+                            if visualize:
+                                self.events.append(("push", names[n.id], f))
+
+                if max_frontier is not None:
+                    self.trim_fringe(fringe, max_frontier, beam)
+
+            if visualize:
+                yield self.take_events()
+
+        self.finished("failed")
+
+    def focal_search(self, epsilon=0.1):
+        """
+        A*-epsilon: the fringe (OPEN, by f = g + h) has a FOCAL subset, the
+        nodes with f <= (1 + epsilon) * the lowest f, and the next node is
+        taken from FOCAL by the secondary estimate g + (1 + epsilon) * h,
+        deeper nodes first among equals. Ordering FOCAL by h alone runs into
+        detours whose nodes are reached again for less and re-expanded many
+        times over; the weighted estimate keeps the cost so far in view.
+        With an admissible heuristic the path costs at most 1 + epsilon
+        times the optimum; stats["bound"] is the tighter factor certified by
+        the lowest f when the goal was taken. Closed nodes reached for less
+        are reopened, nodes_visited counts distinct nodes and
+        stats["reexpanded"] the expansions of reopened ones.
+        """
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        heuristics = self.heuristics
+        state = self.search_state
+        weight = 1 + epsilon
+        self.stats["epsilon"] = epsilon
+        self.stats["reexpanded"] = 0
+        reopened = set()
+
+        # Every open node is in fringe, and in either focal or pending
+        fringe = IndexedPriorityQueue(key=lambda n: n.id)
+        pending = IndexedPriorityQueue(key=lambda n: n.id)
+        focal = IndexedPriorityQueue(key=lambda n: n.id)
+        node = SearchNode(self.source)
+        state.set_g_score(node.id, node.cost)
+        f = node.cost + heuristics[node.id]
+        fringe.add(node, f)
+        pending.add(node, f)
+        if visualize:
+            self.events.append(("push", names[node.id], f))
+
+        while fringe.isNotEmpty():
+            # Admit the pending nodes the lowest f now lets into FOCAL
+            f_min = fringe.top_priority()
+            focal_bound = weight * f_min
+            while pending.isNotEmpty() and pending.top_priority() <= focal_bound:
+                n = pending.pop()
+                focal.add(n, (n.cost + weight * heuristics[n.id], -n.cost))
+            node = focal.pop()
+            fringe.remove(node.id)
+            if visualize:
+                self.events.append(("pop", names[node.id]))
+
+            if self.is_goal_state(node.id):
+                self.stats["bound"] = min(weight, node.cost / f_min) if f_min > 0 else 1
+                self.finished("success", node)
+                return
+
+            if node.id in reopened:
+                reopened.discard(node.id)
+                state.close(node.id)
+                self.stats["reexpanded"] += 1
+            else:
+                self.mark_visited(node.id)
+            if visualize:
+                self.events.append(("close", names[node.id]))
+
+            for n in self.expand(node):
+                if n.cost < state.g_score(n.id):
+                    state.set_g_score(n.id, n.cost)
+                    if self.is_visited(n.id):
+                        state.reopen(n.id)
+                        reopened.add(n.id)
+                    f = n.cost + heuristics[n.id]
+                    if fringe.contains(n.id):
+                        fringe.decrease_key(n, f)
+                        if focal.contains(n.id):
+                            focal.decrease_key(n, (n.cost + weight * heuristics[n.id], -n.cost))
+                        else:
+                            pending.decrease_key(n, f)
+                        if visualize:
+                            self.events.append(("update", names[n.id], f))
+                    else:
+                        fringe.add(n, f)
+                        pending.add(n, f)
+                        if visualize:
+                            self.events.append(("push", names[n.id], f))
+
+            if visualize:
+                yield self.take_events()
+
+        self.finished("failed")
+
+    def anytime_a_star_search(self, weight=2.5, step=0.5):
+        """
+        ARA* (Anytime Repairing A*): weighted A* with f = g + weight * h
+        finds a first path quickly, then the weight is lowered by step
+        towards 1 and the search is repaired rather than restarted. The
+        g-scores and the search tree persist, and only the nodes whose g
+        dropped after they were closed (the inconsistent ones) are queued
+        again with the open nodes. Each improved path is recorded as a
+        ("solution", path, cost, bound) event, bound being the guaranteed
+        suboptimality factor, and without visualization those events are
+        still yielded, one per solution.
+        """
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        heuristics = self.heuristics
+        state = self.search_state
+        self.stats["iterations"] = 0
+        weights = self.stats["weights"] = []
+        solutions = self.stats["solutions"] = []  # (cost, bound) of each improved path
+
+        node = SearchNode(self.source)
+        state.set_g_score(node.id, node.cost)
+        opened = {node.id: node}  # Nodes to queue in the next round
+        inconsistent = {}
+        best = node if self.is_goal_state(node.id) else None  # Cheapest goal node reached
+
+        while True:
+            weights.append(weight)
+            self.stats["iterations"] = len(weights)
+            # Rebuild the fringe with the new weight, closed nodes open again
+            fringe = IndexedPriorityQueue(key=lambda n: n.id)
+            for n in opened.values():
+                fringe.add(n, n.cost + weight * heuristics[n.id])
+            closed = set()
+            if visualize:
+                self.events.append(("round", weight))
+                for item in fringe:
+                    self.events.append(("push", names[item.data.id], item.priority))
+
+            # Improve the path until no queued node can lead to a cheaper one
+            while fringe.isNotEmpty() and (best is None or best.cost > fringe.top_priority()):
+                node = fringe.pop()
+                closed.add(node.id)
+                self.nodes_visited += 1
+                if visualize:
+                    self.events.append(("pop", names[node.id]))
+                    self.events.append(("close", names[node.id]))
+
+                for n in self.expand(node):
+                    if n.cost < state.g_score(n.id):
+                        state.set_g_score(n.id, n.cost)
+                        if self.is_goal_state(n.id) and (best is None or n.cost < best.cost):
+                            best = n
+                        if n.id in closed:
+                            inconsistent[n.id] = n
+                            continue
+                        f = n.cost + weight * heuristics[n.id]
+                        if fringe.contains(n.id):
+                            fringe.decrease_key(n, f)
+                            if visualize:
+                                self.events.append(("update", names[n.id], f))
+                        else:
+                            fringe.add(n, f)
+                            if visualize:
+                                self.events.append(("push", names[n.id], f))
+
+                if visualize:
+                    yield self.take_events()
+
+            if best is None:
+                break
+
+            # The path is within bound of the optimum: no open or inconsistent
+            # node can lead to a goal for less than best.cost / bound
+            opened = {item.data.id: item.data for item in fringe}
+            opened.update(inconsistent)
+            inconsistent = {}
+            lower_bound = min([n.cost + heuristics[n.id] for n in opened.values()], default=best.cost)
+            if best.cost <= lower_bound:
+                bound = 1
+            else:
+                bound = min(weight, best.cost / lower_bound) if lower_bound > 0 else weight
+            if not solutions or best.cost < solutions[-1][0] or bound < solutions[-1][1]:
+                solutions.append((best.cost, bound))
+                event = ("solution", [names[node_id] for node_id in best.path()], best.cost, bound)
+                if visualize:
+                    self.events.append(event)
+                    yield self.take_events()
+                else:
+                    yield [event]
+
+            if bound <= 1 or weight <= 1:
+                break
+            weight = max(1, weight - step)
+
+        if best is None:
+            self.finished("failed")
+        else:
+            self.finished("success", best)
+
+    def bidirectional_search(self):
+        """
+        Bidirectional BFS: Search from both start and goal simultaneously.
+        Meet in the middle for faster search on large graphs.
+        """
+        if not self.start():
+            return
+
+        if not self.goals:
+            self.finished("failed")
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        source_id = self.source
+        goal_ids = sorted(self.goals)
+
+        # Two frontiers: forward from start, backward from every goal at once
+        forward_fringe = deque([source_id])
+        backward_fringe = deque(goal_ids)
+        
+        # Track visited nodes and their predecessors for path reconstruction
+        forward_visited = {}  # {node_id: parent_id}
+        backward_visited = {}
+        
+        # Mark source and goals as visited
+        forward_visited[source_id] = None
+        for goal_id in goal_ids:
+            backward_visited[goal_id] = None
+        
+        # Both fringes show up combined (priority is the side: 0 forward, 1 backward)
+        if visualize:
+            self.events.append(("push", names[source_id], 0))
+            for goal_id in goal_ids:
+                self.events.append(("push", names[goal_id], 1))
+        
+        # Alternate between forward and backward search
+        forward_turn = True
+        meeting_point = None
+        
+        while forward_fringe and backward_fringe:
+            if forward_turn:
+                # Forward search step
+                if not forward_fringe:
+                    break
+                node = forward_fringe.popleft()
+                if visualize:
+                    self.events.append(("pop", names[node]))
+                
+                # Check if this node was visited by backward search (meeting point!)
+                if node in backward_visited:
+                    meeting_point = node
+                    break
+                
+                # Mark as visited from forward direction and show it
+                if node != source_id:
+                    self.mark_visited(node)
+                    if visualize:
+                        self.events.append(("close", names[node]))
+                        yield self.take_events()  # Yield after marking to show the node
+                
+                # Expand forward
+                for child, weight in graph.edges(node):
+                    if child not in forward_visited:
+                        forward_visited[child] = node
+                        forward_fringe.append(child)
+                        if visualize:
+                            self.events.append(("push", names[child], 0))
+                
+            else:
+                # Backward search step
+                if not backward_fringe:
+                    break
+                node = backward_fringe.popleft()
+                if visualize:
+                    self.events.append(("pop", names[node]))
+                
+                # Check if this node was visited by forward search (meeting point!)
+                if node in forward_visited:
+                    meeting_point = node
+                    break
+                
+                # Mark as visited from backward direction and show it
+                if node not in self.goals:
+                    self.mark_visited(node)
+                    if visualize:
+                        self.events.append(("close", names[node]))
+                        yield self.take_events()  # Yield after marking to show the node
+                
+                # Expand backward (parents - nodes that have this as child)
+                for parent, weight in graph.incoming(node):
+                    if parent not in backward_visited:
+                        backward_visited[parent] = node
+                        backward_fringe.append(parent)
+                        if visualize:
+                            self.events.append(("push", names[parent], 1))
+            
+            forward_turn = not forward_turn
+        
+        # Reconstruct path if meeting point found
+        if meeting_point is not None:
+            # Build forward path: start → meeting_point
+            forward_path = []
+            current = meeting_point
+            while current is not None:
+                forward_path.append(current)
+                current = forward_visited.get(current)
+            forward_path.reverse()
+            
+            # Build backward path: meeting_point → goal
+            backward_path = []
+            current = backward_visited.get(meeting_point)
+            while current is not None:
+                backward_path.append(current)
+                current = backward_visited.get(current)
+            
+            # Combine paths
+            full_path = forward_path + backward_path
+            
+            # Chain the combined path into a search tree branch (cost in edges)
+            result_node = None
+            for depth, node in enumerate(full_path):
+                result_node = SearchNode(node, result_node, depth, depth)
+            
+            self.finished("success", result_node)
+            return
+        
+        self.finished("failed")
+
+    def bidirectional_uniform_cost_search(self):
+        return self.weighted_bidirectional_search(informed=False)
+
+    def bidirectional_a_star_search(self):
+        return self.weighted_bidirectional_search(informed=True)
+
+    def weighted_bidirectional_search(self, informed):
+        """
+        Bidirectional Dijkstra, or A* with balanced potentials when informed:
+        a forward search from the source and a backward search from every
+        goal along the incoming edges, each popping its lowest key. It stops
+        once the cheapest path met so far (mu) is no longer than the sum of
+        the two lowest keys, so the path is cost optimal.
+        """
+        if not self.start():
+            return
+
+        if not self.goals:
+            self.finished("failed")
+            return
+
+        graph = self.compiled
+        names = graph.names
+        visualize = self.visualize
+        heuristics = self.heuristics
+        source_heuristic = heuristics[self.source]
+        if informed and source_heuristic == float("inf"):
+            self.finished("failed")  # Landmarks proved the goals unreachable
+            return
+
+        # Balanced potential: half the difference between the estimate to the
+        # goals (the node heuristic) and the estimate from the source, which a
+        # consistent heuristic bounds by h(source) - h(node). Forward keys add
+        # it and backward keys subtract it, so both sides see the same reduced
+        # edge costs and the potentials cancel out of the stopping rule
+        def potential(node):
+            if not informed:
+                return 0
+            return (heuristics[node] - (source_heuristic - heuristics[node])) / 2
+
+        # Index 0 is the forward side, 1 the backward side
+        fringes = (IndexedPriorityQueue(key=lambda n: n), IndexedPriorityQueue(key=lambda n: n))
+        g_scores = ({}, {})
+        parents = ({}, {})
+        closed = (set(), set())
+
+        g_scores[0][self.source] = 0
+        parents[0][self.source] = None
+        fringes[0].add(self.source, potential(self.source))
+        for goal in sorted(self.goals):
+            g_scores[1][goal] = 0
+            parents[1][goal] = None
+            fringes[1].add(goal, -potential(goal))
+        if visualize:
+            for fringe in fringes:
+                for item in fringe:
+                    self.events.append(("push", names[item.data], item.priority))
+
+        # Cost of the cheapest source-goal path met so far and where it met
+        mu = 0 if self.source in self.goals else float("inf")
+        meeting_point = self.source if mu == 0 else None
+
+        while fringes[0].isNotEmpty() and fringes[1].isNotEmpty():
+            top_forward, top_backward = fringes[0].top_priority(), fringes[1].top_priority()
+            if mu <= top_forward + top_backward:
+                break
+
+            # Advance the side with the lower key
+            side = 0 if top_forward <= top_backward else 1
+            sign = 1 if side == 0 else -1
+            fringe, g_score, other_g_score = fringes[side], g_scores[side], g_scores[1 - side]
+            node = fringe.pop()
+            closed[side].add(node)
+            self.mark_visited(node)
+            if visualize:
+                self.events.append(("pop", names[node]))
+                # Goals keep their own color
+                if not self.is_goal_state(node):
+                    self.events.append(("close", names[node]))
+
+            edges = graph.edges(node) if side == 0 else graph.incoming(node)
+            for neighbor, weight in edges:
+                if neighbor in closed[side]:
+                    continue
+                cost = g_score[node] + weight
+                if cost < g_score.get(neighbor, float("inf")):
+                    g_score[neighbor] = cost
+                    parents[side][neighbor] = node
+                    key = cost + sign * potential(neighbor)
+                    if fringe.contains(neighbor):
+                        fringe.decrease_key(neighbor, key)
+                        if visualize:
+                            self.events.append(("update", names[neighbor], key))
+                    else:
+                        fringe.add(neighbor, key)
+                        if visualize:
+                            self.events.append(("push", names[neighbor], key))
+                    # The other side reached this node already: a full path
+                    if neighbor in other_g_score and cost + other_g_score[neighbor] < mu:
+                        mu = cost + other_g_score[neighbor]
+                        meeting_point = neighbor
+
+            if visualize:
+                yield self.take_events()
+
+        if meeting_point is None:
+            self.finished("failed")
+            return
+
+        # Source -> meeting point from the forward parents, then on to the
+        # goal from the backward ones
+        path = []
+        current = meeting_point
+        while current is not None:
+            path.append(current)
+            current = parents[0][current]
+        path.reverse()
+        meeting_depth = len(path) - 1
+        current = parents[1][meeting_point]
+        while current is not None:
+            path.append(current)
+            current = parents[1][current]
+
+        # Chain the path into a search tree branch carrying the path costs
+        result_node = None
+        for depth, node in enumerate(path):
+            cost = g_scores[0][node] if depth <= meeting_depth else mu - g_scores[1][node]
+            result_node = SearchNode(node, result_node, cost, depth)
+
+        self.finished("success", result_node)
+
+    def contraction_hierarchy_search(self, hierarchy):
+        """
+        Query a [ContractionHierarchy] of the graph: Dijkstra along the
+        upward edges from the source, and backwards along the upward edges
+        into the goals. A side stops once its lowest cost reaches the
+        cheapest path met so far (mu). The shortcuts of the path are then
+        unpacked into the original edges.
+        """
+        if not self.start():
+            return
+
+        graph = self.compiled
+        if hierarchy.size != len(graph) or hierarchy.fingerprint != graph.fingerprint:
+            raise ValueError("the hierarchy was built for another graph")
+        names = graph.names
+        visualize = self.visualize
+
+        # Index 0 is the forward side, 1 the backward side
+        fringes = (IndexedPriorityQueue(key=lambda n: n), IndexedPriorityQueue(key=lambda n: n))
+        g_scores = ({self.source: 0}, {})
+        parents = ({self.source: None}, {})
+        fringes[0].add(self.source, 0)
+        for goal in sorted(self.goals):
+            g_scores[1][goal] = 0
+            parents[1][goal] = None
+            fringes[1].add(goal, 0)
+        if visualize:
+            for fringe in fringes:
+                for item in fringe:
+                    self.events.append(("push", names[item.data], item.priority))
+
+        mu = 0 if self.source in self.goals else float("inf")
+        meeting_point = self.source if mu == 0 else None
+
+        while True:
+            # Advance the side with the lower cost among those still below mu
+            tops = [fringe.top_priority() if fringe.isNotEmpty() else float("inf") for fringe in fringes]
+            side = 0 if tops[0] <= tops[1] else 1
+            if tops[side] >= mu:
+                break
+            fringe, g_score, other_g_score = fringes[side], g_scores[side], g_scores[1 - side]
+            node = fringe.pop()
+            self.mark_visited(node)
+            if visualize:
+                self.events.append(("pop", names[node]))
+                if not self.is_goal_state(node):
+                    self.events.append(("close", names[node]))
+            if node in other_g_score and g_score[node] + other_g_score[node] < mu:
+                mu = g_score[node] + other_g_score[node]
+                meeting_point = node
+
+            edges = hierarchy.up(node) if side == 0 else hierarchy.down(node)
+            for neighbor, weight, _ in edges:
+                cost = g_score[node] + weight
+                if cost < g_score.get(neighbor, float("inf")):
+                    g_score[neighbor] = cost
+                    parents[side][neighbor] = node
+                    if fringe.contains(neighbor):
+                        fringe.decrease_key(neighbor, cost)
+                        if visualize:
+                            self.events.append(("update", names[neighbor], cost))
+                    else:
+                        fringe.add(neighbor, cost)
+                        if visualize:
+                            self.events.append(("push", names[neighbor], cost))
+
+            if visualize:
+                yield self.take_events()
+
+        if meeting_point is None:
+            self.finished("failed")
+            return
+
+        # Hierarchy path: source -> meeting point -> goal
+        path = []
+        current = meeting_point
+        while current is not None:
+            path.append(current)
+            current = parents[0][current]
+        path.reverse()
+        current = parents[1][meeting_point]
+        while current is not None:
+            path.append(current)
+            current = parents[1][current]
+
+        # Unpack the shortcuts and chain the original edges into a search
+        # tree branch carrying the path costs
+        unpacked = [path[0]]
+        for source, target in zip(path, path[1:]):
+            unpacked.extend(hierarchy.unpack(source, target))
+        self.stats["hierarchy_edges"] = len(path) - 1
+
+        self.finished("success", self.chain(unpacked))
+
+    def shortest_path_tree_search(self, tree):
+        """
+        Answer from a cached [ShortestPathTree] of the source: the nearest
+        goal by its distance, and the path by walking the tree's parents.
+        """
+        if not self.start():
+            return
+
+        graph = self.compiled
+        if (tree.reverse or tree.source != self.source or tree.version != graph.version
+                or len(tree.distances) != len(graph)):
+            raise ValueError("the tree was built for another source or graph")
+        goal = tree.nearest(self.goals)
+        self.stats["reached"] = tree.reached
+        if goal is None:
+            self.finished("failed")
+        else:
+            self.finished("success", self.chain(tree.path(goal)))
+        if self.visualize:
+            yield self.take_events()
+
+    def lifelong_a_star_search(self, planner):
+        """
+        Lifelong Planning A*: run the graph's [IncrementalPlanner], which
+        only repairs the part of its previous search that the edits made
+        since then invalidated. The visited nodes are that repaired region.
+        """
+        if not self.start():
+            return
+
+        graph = self.compiled
+        names = graph.names
+        goals = [names[goal] for goal in sorted(self.goals)]
+        for events in planner.search(names[self.source], goals, self.visualize):
+            self.events.extend(events)
+            yield self.take_events()
+        self.nodes_visited = planner.expanded
+
+        if planner.cost is None:
+            self.finished("failed")
+            return
+
+        # Chain the path into a search tree branch carrying the path costs
+        result_node = SearchNode(self.source)
+        for parent_name, name in zip(planner.path, planner.path[1:]):
+            cost = result_node.cost + self.graph[parent_name].children[name]
+            result_node = SearchNode(graph.ids[name], result_node, cost, result_node.depth + 1)
+
+        self.finished("success", result_node)
+
+    ################################################
+    ########		Utility Functions		########
+    ################################################
+
+    # The per-run [SearchState] (closed flags and g-scores)
+    @property
+    def search_state(self):
+        if self.__search_state is None:
+            self.__search_state = SearchState(len(self.compiled))
+        return self.__search_state
+
+    @property
+    def is_searching(self):
+        return self.status == "searching"
+
+    # The [SearchResult] of the finished run
+    @property
+    def result(self):
+        return SearchResult(self.status, self.path_array, self.result_node, self.nodes_visited, self.stats)
+
+    # Hand the events recorded since the last call to the consumer
+    def take_events(self):
+        events = self.events
+        self.events = []
+        return events
+
+    # A session runs one algorithm, refuse to start it twice
+    def start(self):
+        if self.status != "idle":
+            return False
+        self.status = "searching"
+        return True
+
+    # Whether a node (by compiled id) was already visited in this run
+    def is_visited(self, node_id):
+        return self.search_state.is_closed(node_id)
+
+    def mark_visited(self, node_id):
+        # Track visited nodes
+        if not self.search_state.is_closed(node_id):
+            self.search_state.close(node_id)
+            self.nodes_visited += 1
+
+    # Chain a path of ids into a search tree branch carrying the path costs,
+    # following the cheapest edge between consecutive nodes
+    def chain(self, path):
+        graph = self.compiled
+        node = SearchNode(path[0])
+        for node_id in path[1:]:
+            node = SearchNode(node_id, node, node.cost + graph.edge_weight(node.id, node_id), node.depth + 1)
+        return node
+
+    # Checks whether the state is the goal state (goal)
+    def is_goal_state(self, node_id):
+        return node_id in self.goals
+
+    # Expand a node to its valid new states
+    def expand(self, node):
+        # Children are compiled sorted by name to ensure leftmost-first traversal
+        graph = self.compiled
+        neighbors, weights = graph.neighbors, graph.weights
+        return [SearchNode(neighbors[k], node, node.cost + weights[k], node.depth + 1)
+                for k in range(graph.offsets[node.id], graph.offsets[node.id + 1])]
+
+    # Keep a best-first fringe within max_frontier entries by dropping the
+    # worst ones. Beam search simply forgets them. Otherwise (SMA*) the
+    # parent of a dropped node backs up the lowest priority among its
+    # dropped children, and is queued again as soon as that priority beats
+    # the whole fringe, so the forgotten branch is regenerated once it is
+    # the most promising one again
+    def trim_fringe(self, fringe, max_frontier, beam):
+        state = self.search_state
+        names = self.compiled.names
+        backed_up = self.backed_up
+        self.stats.setdefault("dropped", 0)
+        while True:
+            while len(fringe) > max_frontier:
+                node, priority = fringe.pop_worst()
+                self.stats["dropped"] += 1
+                state.clear_g_score(node.id)
+                if self.visualize:
+                    self.events.append(("pop", names[node.id]))
+
+                parent = node.parent
+                if beam or parent is None:
+                    continue
+                if parent.id not in backed_up or priority < backed_up[parent.id][0]:
+                    backed_up[parent.id] = (priority, parent)
+                    heapq.heappush(self.forgotten, (priority, parent.id))
+
+            if not self.forgotten or (fringe.isNotEmpty() and self.forgotten[0][0] >= fringe.top_priority()):
+                break
+            priority, parent_id = heapq.heappop(self.forgotten)
+            if backed_up.get(parent_id, (None,))[0] != priority:
+                continue  # Superseded by a lower backup
+            parent = backed_up.pop(parent_id)[1]
+            if fringe.contains(parent_id):
+                continue
+            state.reopen(parent_id)
+            fringe.add(parent, priority)
+            if self.visualize:
+                self.events.append(("push", names[parent_id], priority))
+        self.stats["peak_fringe"] = max(self.stats.get("peak_fringe", 0), len(fringe))
+
+    # Return actual cost
+    def cost(self, node):
+        return node.cost
+
+    # Retuen Heuristic
+    def heuristic(self, node):
+        return self.heuristics[node.id]
+
+    # Finished with "success" or "failed"
+    def finished(self, result, goal=None):
+        self.status = result
+        if result == "failed":
+            return
+
+        # Rebuild the solution path once by walking the parent pointers
+        names = self.compiled.names
+        self.path_array = [names[node_id] for node_id in goal.path()]
+        if len(self.sources) > 1:
+            self.stats["source"] = self.path_array[0]  # Where the path comes from
+        path = self.path_array[:-1]
+        self.result_node = Node.copy_from(self.graph[names[goal.id]], goal.cost, path)
+
+        if self.visualize:
+            self.events.append(("path", self.path_array))
+            try:
+                print(f"finished: result={result}, goal={names[goal.id]}, path={path}")
+            except Exception:
+                print(f"finished: result={result}")
+
+
+# Represents the outcome of a [SearchSession]
+class SearchResult(object):
+    """Status ("success" or "failed"), solution path (node names from the
+    source to the goal), its cost, the number of nodes visited and the
+    algorithm specific stats (e.g. the IDA* thresholds)"""
+
+    __slots__ = ("status", "path", "cost", "nodes_visited", "stats")
+
+    def __init__(self, status, path, goal_node, nodes_visited, stats=None):
+        self.status = status
+        self.path = path
+        self.cost = goal_node.cost if goal_node is not None else None
+        self.nodes_visited = nodes_visited
+        self.stats = {} if stats is None else stats
+
+    @property
+    def success(self):
+        return self.status == "success"
+
+    def __repr__(self):
+        stats = f", stats={self.stats!r}" if self.stats else ""
+        return f"SearchResult(status={self.status!r}, path={self.path!r}, cost={self.cost!r}, nodes_visited={self.nodes_visited}{stats})"
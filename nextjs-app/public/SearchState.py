@@ -0,0 +1,46 @@
+from array import array
+
+
+# Represents the per-run [SearchState] of a search over a [CompiledGraph]
+class SearchState(object):
+    """Closed flags and g-scores of one search run, indexed by compiled id.
+
+    Entries are stamped with the epoch of the run that wrote them and
+    anything stamped with an older epoch reads as unset, so reset() is
+    O(1) instead of a walk over every node.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.epoch = 1
+        self.closed = array("l", [0]) * size  # epoch in which the node was closed
+        self.g_stamp = array("l", [0]) * size  # epoch in which g_scores was written
+        self.g_scores = array("d", [0.0]) * size
+
+    # Forget everything from the previous run
+    def reset(self):
+        self.epoch += 1
+
+    def is_closed(self, node_id):
+        return self.closed[node_id] == self.epoch
+
+    def close(self, node_id):
+        self.closed[node_id] = self.epoch
+
+    # Open a closed node again so it can be expanded once more
+    def reopen(self, node_id):
+        self.closed[node_id] = 0
+
+    # Forget the node's g-score, it reads as unseen again
+    def clear_g_score(self, node_id):
+        self.g_stamp[node_id] = 0
+
+    # Best known cost to reach the node in this run (infinity when unseen)
+    def g_score(self, node_id):
+        if self.g_stamp[node_id] != self.epoch:
+            return float("inf")
+        return self.g_scores[node_id]
+
+    def set_g_score(self, node_id, cost):
+        self.g_stamp[node_id] = self.epoch
+        self.g_scores[node_id] = cost
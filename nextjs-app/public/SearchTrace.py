@@ -0,0 +1,62 @@
+# Represents the [SearchTrace] rebuilt from the events of a [SearchSession]
+class SearchTrace(object):
+    """Applies the delta events a visualized search yields after each step:
+
+        ("push", name, priority)    name entered the fringe
+        ("update", name, priority)  the priority of its queued entry was lowered
+        ("pop", name)               name left the fringe
+        ("close", name)             name was visited
+        ("round", limit)            iterative deepening restarted with a new limit
+        ("path", names)             the solution path, from the source to the goal
+        ("solution", names, cost, bound)  an anytime search improved its path,
+                                    bound is the guaranteed suboptimality factor
+
+    Applying an event is O(1); the arrays the data panel shows are
+    materialized on demand.
+    """
+
+    def __init__(self):
+        self.fringe = {}  # {name: [entries, priority]} in the order names entered it
+        self.visited = set()
+        self.visited_array = []  # Nodes that have been visited
+        self.traversal_array = []  # Order in which nodes were visited
+        self.path_array = []  # Final solution path, or the best one so far
+        self.solutions = []  # (cost, bound) of each path an anytime search improved
+        self.round_start = 0  # Where the current iterative deepening round starts
+
+    def apply(self, events):
+        for event in events:
+            kind = event[0]
+            if kind == "push":
+                entry = self.fringe.get(event[1])
+                if entry is None:
+                    self.fringe[event[1]] = [1, event[2]]
+                else:
+                    entry[0] += 1
+                    entry[1] = event[2]
+            elif kind == "pop":
+                entry = self.fringe[event[1]]
+                entry[0] -= 1
+                if entry[0] == 0:
+                    del self.fringe[event[1]]
+            elif kind == "close":
+                name = event[1]
+                self.traversal_array.append(name)
+                if name not in self.visited:
+                    self.visited.add(name)
+                    self.visited_array.append(name)
+            elif kind == "update":
+                self.fringe[event[1]][1] = event[2]
+            elif kind == "round":
+                self.fringe.clear()
+                self.round_start = len(self.traversal_array)
+            elif kind == "path":
+                self.path_array = event[1]
+            elif kind == "solution":
+                self.path_array = event[1]
+                self.solutions.append((event[2], event[3]))
+
+    # Current fringe/frontier nodes, one item per queued entry
+    @property
+    def fringe_array(self):
+        return [name for name, entry in self.fringe.items() for _ in range(entry[0])]
@@ -0,0 +1,65 @@
+import heapq
+from array import array
+
+
+# Represents the one-to-all [ShortestPathTree] of a source in a [CompiledGraph]
+class ShortestPathTree(object):
+    """Dijkstra from one source to every node, kept for later queries.
+
+    distances[i] is the cost of the cheapest path from the source to node i
+    (infinity when there is none) and parents[i] its predecessor on that
+    path (-1 for the source and for unreachable nodes). Any goal is then
+    answered by walking the parents, see path(). version is the version of
+    the [Graph] the snapshot was compiled from.
+
+    A reverse tree follows the incoming edges instead: distances[i] is the
+    cost from node i to the source (its root) and parents[i] the next node
+    on the way there.
+    """
+
+    def __init__(self, compiled, source, reverse=False):
+        self.source = source
+        self.reverse = reverse
+        self.version = compiled.version
+        self.distances = array("d", [float("inf")]) * len(compiled)
+        self.parents = array("l", [-1]) * len(compiled)
+        self.reached = 0  # Nodes with a path from the source
+
+        distances, parents = self.distances, self.parents
+        if reverse:
+            offsets, neighbors, weights = compiled.in_offsets, compiled.in_neighbors, compiled.in_weights
+        else:
+            offsets, neighbors, weights = compiled.offsets, compiled.neighbors, compiled.weights
+        distances[source] = 0
+        heap = [(0, source)]
+        while heap:
+            cost, node = heapq.heappop(heap)
+            if cost > distances[node]:
+                continue
+            self.reached += 1
+            for k in range(offsets[node], offsets[node + 1]):
+                neighbor = neighbors[k]
+                new_cost = cost + weights[k]
+                if new_cost < distances[neighbor]:
+                    distances[neighbor] = new_cost
+                    parents[neighbor] = node
+                    heapq.heappush(heap, (new_cost, neighbor))
+
+    # The nearest of the goals (compiled ids), None when none is reachable
+    def nearest(self, goals):
+        goal = min(goals, key=lambda node: (self.distances[node], node), default=None)
+        if goal is None or self.distances[goal] == float("inf"):
+            return None
+        return goal
+
+    # Ids from the source to the goal, empty when the goal is unreachable.
+    # In a reverse tree the path runs from the given node to the root
+    def path(self, goal):
+        if self.distances[goal] == float("inf"):
+            return []
+        path = [goal]
+        while path[-1] != self.source:
+            path.append(self.parents[path[-1]])
+        if not self.reverse:
+            path.reverse()
+        return path
@@ -442,13 +442,13 @@ def restore_state(state):
     
     # Restore all nodes
     for name, node_data in state['graph'].items():
-        search_agent.graph[name] = Node(
+        search_agent.graph.add_node(Node(
             node_data['name'],
             node_data['position'],
             state=node_data['state'],
+            heuristic=node_data['heuristic'],
             children=node_data['children']
-        )
-        search_agent.graph[name].heuristic = node_data['heuristic']
+        ))
     
     # Clear selection
     selected_node_name = unselected
@@ -518,13 +518,13 @@ def load_graph_state_from_save(state):
                 child_name = int(child_key) if str(child_key).isdigit() else child_key
                 children[child_name] = float(child_val)
             
-            search_agent.graph[name] = Node(
+            search_agent.graph.add_node(Node(
                 int(node_data['name']),
                 tuple(node_data['position']),
                 state=node_data['state'],
+                heuristic=node_data['heuristic'],
                 children=children
-            )
-            search_agent.graph[name].heuristic = node_data['heuristic']
+            ))
         
         # Clear selection
         selected_node_name = unselected
@@ -616,9 +616,9 @@ def handle_tool_action(event):
             if get_clicked_node_name(x, y, circle_radius * 3) == -1:
                 save_state()  # Save state before adding node
                 node_counter += 1
-                search_agent.graph[node_counter] = Node(
+                search_agent.graph.add_node(Node(
                     node_counter, (x, y), children={}
-                )
+                ))
                 graph_updated = True
         elif selected_tool in ["add_edge"]:
             selected_node_name = unselected
@@ -629,8 +629,8 @@ def handle_tool_action(event):
             if edge_ends != -1:
                 save_state()  # Save state before deleting edge
                 from_node, to_node = edge_ends
-                search_agent.graph[from_node].children.pop(to_node, None)
-                search_agent.graph[to_node].children.pop(from_node, None)
+                search_agent.graph.remove_edge(from_node, to_node)
+                search_agent.graph.remove_edge(to_node, from_node)
                 graph_updated = True
             else:
                 # Reset selection if clicking empty space
@@ -645,27 +645,25 @@ def handle_tool_action(event):
     else:
         # Node clicked
         if selected_tool == "toggle_goal":
-            if search_agent.graph[node_name].state != "source":
+            if node_name != search_agent.graph.source:
                 save_state()  # Save state before toggling goal
-                if search_agent.graph[node_name].state == "goal":
-                    search_agent.graph[node_name].state = "empty"
+                if node_name in search_agent.graph.goals:
+                    search_agent.graph.set_state(node_name, "empty")
                 else:
-                    search_agent.graph[node_name].state = "goal"
-                    search_agent.graph[node_name].heuristic = 0
+                    search_agent.graph.set_state(node_name, "goal")
+                    search_agent.graph.set_heuristic(node_name, 0)
                 graph_updated = True
         
         elif selected_tool == "update_heuristic":
-            if search_agent.graph[node_name].state != "goal":
+            if node_name not in search_agent.graph.goals:
                 selected_node_name = node_name
                 show_input_dialog()
                 graph_updated = True
         
         elif selected_tool == "delete_node":
-            if search_agent.graph[node_name].state != "source":
+            if node_name != search_agent.graph.source:
                 save_state()  # Save state before deleting node
-                search_agent.graph.pop(node_name)
-                for node in search_agent.graph.values():
-                    search_agent.graph[node.name].children.pop(node_name, None)
+                search_agent.graph.remove_node(node_name)
                 graph_updated = True
         
         elif selected_tool == "add_edge":
@@ -675,8 +673,8 @@ def handle_tool_action(event):
             elif selected_node_name != node_name:
                 if node_name not in search_agent.graph[selected_node_name].children:
                     save_state()  # Save state before adding edge
-                    search_agent.graph[selected_node_name].children[node_name] = 1
-                    search_agent.graph[node_name].children[selected_node_name] = 1
+                    search_agent.graph.add_edge(selected_node_name, node_name, 1)
+                    search_agent.graph.add_edge(node_name, selected_node_name, 1)
                     selected_node_name = unselected
                     graph_updated = True
         
@@ -687,8 +685,8 @@ def handle_tool_action(event):
             elif selected_node_name != node_name:
                 if node_name in search_agent.graph[selected_node_name].children:
                     save_state()  # Save state before deleting edge
-                    search_agent.graph[selected_node_name].children.pop(node_name, None)
-                    search_agent.graph[node_name].children.pop(selected_node_name, None)
+                    search_agent.graph.remove_edge(selected_node_name, node_name)
+                    search_agent.graph.remove_edge(node_name, selected_node_name)
                     selected_node_name = unselected
                     graph_updated = True
 
@@ -884,7 +882,10 @@ def animation_loop(event=None):
         now = javascript.Date.now()
         if now - start_date >= 500:  # 500ms between steps
             try:
+                # Each step yields its delta events, already applied to the agent's trace
                 next(search_generator)
+                # Show the nodes visited in this step
+                search_agent.paint()
                 graph_updated = True
                 # Debug: print current node states after each step
                 try:
@@ -907,6 +908,10 @@ def animation_loop(event=None):
                     
             except StopIteration:
                 print("Search completed")
+                # Write the solution path (or failure) back to the node states
+                search_agent.paint()
+                # The path event arrives with the final step
+                update_data_panel()
                 # Re-enable solve button when search finishes
                 try:
                     document["solve"].disabled = False
@@ -920,14 +925,8 @@ def animation_loop(event=None):
                 # Get result details
                 success = search_agent.agent_status == "success"
                 nodes_visited = search_agent.nodes_visited
-                path_cost = 0
-                
-                if success:
-                    # Find goal node to get path cost
-                    for node in search_agent.graph.values():
-                        if node.state == "path" or node.state == "goal":
-                            path_cost = len([n for n in search_agent.graph.values() if n.state == "path"])
-                            break
+                # Edges on the solution path
+                path_cost = len(search_agent.path_array) - 1 if success else 0
                 
                 # Show search results toast
                 show_search_results(success, path_cost, nodes_visited, time_taken)
@@ -1221,7 +1220,7 @@ def update_heuristic():
     if validated:
         save_state()  # Save state before updating heuristic
         heuristic = int(document["weights-input"].value)
-        search_agent.graph[selected_node_name].heuristic = heuristic
+        search_agent.graph.set_heuristic(selected_node_name, heuristic)
         hide_input_dialog()
         graph_updated = True
 
@@ -1233,8 +1232,8 @@ def update_weight():
         save_state()  # Save state before updating weight
         weight = int(document["weights-input"].value)
         from_node, to_node = selected_edge_ends
-        search_agent.graph[from_node].children[to_node] = weight
-        search_agent.graph[to_node].children[from_node] = weight
+        search_agent.graph.add_edge(from_node, to_node, weight)
+        search_agent.graph.add_edge(to_node, from_node, weight)
         hide_input_dialog()
         graph_updated = True
 
@@ -1243,13 +1242,7 @@ def start_search():
     global search_generator, start_date, search_start_time, gif_recorder, graph_updated
     
     # Check if there's a goal
-    has_goal = False
-    for node in search_agent.graph.values():
-        if node.state == "goal":
-            has_goal = True
-            break
-    
-    if not has_goal:
+    if not search_agent.graph.goals:
         window.alert("Please set at least one goal node (green) before starting search!")
         return
     
@@ -1278,8 +1271,16 @@ def execute_search():
         "iterative-deepening": lambda: search_agent.iterative_deepening_search(iterative_deepening_max),
         "uniform-cost": search_agent.uniform_cost_search,
         "bidirectional": search_agent.bidirectional_search,
+        "bidirectional-uniform-cost": search_agent.bidirectional_uniform_cost_search,
         "greedy": search_agent.greedy_search,
         "a*": search_agent.a_star_search,
+        "bidirectional-a*": search_agent.bidirectional_a_star_search,
+        "ida*": search_agent.iterative_deepening_a_star_search,
+        "ara*": search_agent.anytime_a_star_search,
+        "focal": lambda: search_agent.focal_search(0.1),
+        "lpa*": search_agent.lifelong_a_star_search,
+        "shortest-path-tree": search_agent.shortest_path_tree_search,
+        "nearest-goals": search_agent.nearest_goals_search,
     }
     
     if selected_search_algorithm in algorithms:
@@ -1288,6 +1289,8 @@ def execute_search():
         # Record search start time
         search_start_time = javascript.Date.now()
         
+        # Clear the states painted by the previous search
+        search_agent.reset_graph()
         search_generator = algorithms[selected_search_algorithm]()
         # Debug: show generator object
         try:
@@ -1303,6 +1306,7 @@ def execute_search():
         except StopIteration:
             # Generator finished immediately
             print("search_generator finished immediately")
+        search_agent.paint()
 
         # Disable solve button to prevent multiple starts
         try:
@@ -1450,8 +1454,16 @@ def main():
     document["iterative-deepening"].bind("click", lambda e: (select_algorithm("iterative-deepening"), update_selected_display("Iterative Deepening")))
     document["uniform-cost"].bind("click", lambda e: (select_algorithm("uniform-cost"), update_selected_display("Uniform Cost Search")))
     document["bidirectional"].bind("click", lambda e: (select_algorithm("bidirectional"), update_selected_display("Bidirectional Search")))
+    document["bidirectional-uniform-cost"].bind("click", lambda e: (select_algorithm("bidirectional-uniform-cost"), update_selected_display("Bidirectional Uniform Cost")))
     document["greedy"].bind("click", lambda e: (select_algorithm("greedy"), update_selected_display("Greedy Best First")))
     document["a*"].bind("click", lambda e: (select_algorithm("a*"), update_selected_display("A* Search")))
+    document["bidirectional-a*"].bind("click", lambda e: (select_algorithm("bidirectional-a*"), update_selected_display("Bidirectional A*")))
+    document["ida*"].bind("click", lambda e: (select_algorithm("ida*"), update_selected_display("IDA* Search")))
+    document["ara*"].bind("click", lambda e: (select_algorithm("ara*"), update_selected_display("Anytime A* (ARA*)")))
+    document["focal"].bind("click", lambda e: (select_algorithm("focal"), update_selected_display("Focal A* (10%)")))
+    document["lpa*"].bind("click", lambda e: (select_algorithm("lpa*"), update_selected_display("Lifelong A* (LPA*)")))
+    document["shortest-path-tree"].bind("click", lambda e: (select_algorithm("shortest-path-tree"), update_selected_display("Cached Shortest-Path Tree")))
+    document["nearest-goals"].bind("click", lambda e: (select_algorithm("nearest-goals"), update_selected_display("All Goals (One Sweep)")))
     
     # Bind solve button
     document["solve"].bind("click", lambda e: start_search())